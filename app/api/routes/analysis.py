@@ -1,31 +1,45 @@
 """API routes for log analysis."""
 
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+from typing import Annotated, Any
 
-from app.core.exceptions import (
-    GCPIntegrationError,
-    LogAnalysisError,
-    LLMError
-)
+from cachetools import TTLCache
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
+
+from app.core.config import get_settings
+from app.core.exceptions import OnCallAgentError
 from app.core.logging import logger
+from app.integrations.gcp import GCPLoggingClient, get_gcp_logging_client
 from app.schemas.analysis import (
     LogAnalysisRequest,
     LogAnalysisResponse,
+    AnalysisErrorResponse,
     AnalysisStatusResponse
 )
-from app.services.analysis_service import AnalysisService
+from app.services.analysis_service import AnalysisService, get_analysis_service
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
+# Dashboards poll /quick-stats with a handful of windows, so cache recent results
+_stats_cache: TTLCache = TTLCache(maxsize=64, ttl=get_settings().quick_stats_cache_ttl)
+
+# Statistics fetches in progress, so concurrent misses for a key share one GCP request
+_stats_in_flight: dict[tuple[str | None, int], asyncio.Task] = {}
+
 
 @router.post(
     "/",
     response_model=LogAnalysisResponse,
+    # Findings without a code example are common; don't send null fields
+    response_model_exclude_none=True,
     status_code=status.HTTP_200_OK,
     summary="Analyze GCP logs",
     description="Fetch logs from GCP, analyze them with LLM, and generate a report with fix suggestions"
 )
-async def analyze_logs(request: LogAnalysisRequest) -> LogAnalysisResponse:
+async def analyze_logs(
+    request: LogAnalysisRequest,
+    service: Annotated[AnalysisService, Depends(get_analysis_service)]
+) -> LogAnalysisResponse:
     """
     Analyze GCP logs and generate fix suggestions.
 
@@ -37,79 +51,83 @@ async def analyze_logs(request: LogAnalysisRequest) -> LogAnalysisResponse:
 
     Args:
         request: Log analysis request with parameters
+        service: Shared analysis service instance
 
     Returns:
         Complete analysis response with findings and document path
 
     Raises:
-        HTTPException: If analysis fails
+        OnCallAgentError: If analysis fails (handled by the app's exception handlers)
     """
-    try:
-        logger.info(
-            "Received log analysis request",
-            extra={
-                "hours_back": request.hours_back,
-                "focus_on_errors": request.focus_on_errors,
-                "output_format": request.output_format
-            }
-        )
+    logger.info(
+        "Received log analysis request",
+        extra={
+            "hours_back": request.hours_back,
+            "focus_on_errors": request.focus_on_errors,
+            "output_format": request.output_format
+        }
+    )
 
-        service = AnalysisService()
-        result = await service.analyze_logs(request)
+    return await service.analyze_logs(request)
 
-        return result
 
-    except GCPIntegrationError as e:
-        logger.error(
-            "GCP integration error during analysis",
-            extra={"error": str(e), "code": e.code}
-        )
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail={
-                "error": "GCP integration failed",
-                "message": e.message,
-                "code": e.code
-            }
-        )
-    except LLMError as e:
-        logger.error(
-            "LLM error during analysis",
-            extra={"error": str(e), "code": e.code}
-        )
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail={
-                "error": "LLM analysis failed",
-                "message": e.message,
-                "code": e.code
-            }
-        )
-    except LogAnalysisError as e:
-        logger.error(
-            "Log analysis error",
-            extra={"error": str(e), "code": e.code}
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "error": "Analysis failed",
-                "message": e.message,
-                "code": e.code
-            }
-        )
-    except Exception as e:
-        logger.error(
-            "Unexpected error during analysis",
-            extra={"error": str(e)}
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "error": "Internal server error",
-                "message": str(e)
-            }
-        )
+@router.post(
+    "/batch",
+    response_model=list[LogAnalysisResponse | AnalysisErrorResponse],
+    # Match POST /analysis/ so both endpoints return the same response shape
+    response_model_exclude_none=True,
+    status_code=status.HTTP_200_OK,
+    summary="Analyze GCP logs in batch",
+    description="Run several log analyses concurrently and return one result per request"
+)
+async def analyze_logs_batch(
+    requests: Annotated[list[LogAnalysisRequest], Body(min_length=1, max_length=10)],
+    service: Annotated[AnalysisService, Depends(get_analysis_service)]
+) -> list[LogAnalysisResponse | AnalysisErrorResponse]:
+    """
+    Run several log analyses concurrently on the shared analysis service.
+
+    A failed analysis does not abort the others; its slot in the result list
+    holds an error entry instead.
+
+    Args:
+        requests: Log analysis requests (1-10)
+        service: Shared analysis service instance
+
+    Returns:
+        Analysis responses or error entries, in request order
+    """
+    logger.info(
+        "Received batch log analysis request",
+        extra={"batch_size": len(requests)}
+    )
+
+    results = await asyncio.gather(
+        *(service.analyze_logs(request) for request in requests),
+        return_exceptions=True
+    )
+
+    responses: list[LogAnalysisResponse | AnalysisErrorResponse] = []
+    for result in results:
+        if isinstance(result, OnCallAgentError):
+            responses.append(AnalysisErrorResponse(
+                error="Analysis failed",
+                message=result.message,
+                code=result.code
+            ))
+        elif isinstance(result, BaseException):
+            logger.error(
+                "Unexpected error during batch analysis",
+                extra={"error": str(result)}
+            )
+            responses.append(AnalysisErrorResponse(
+                error="Internal server error",
+                message=str(result)
+            ))
+        else:
+            responses.append(result)
+
+    return responses
 
 
 @router.get(
@@ -118,7 +136,10 @@ async def analyze_logs(request: LogAnalysisRequest) -> LogAnalysisResponse:
     summary="Get analysis status",
     description="Get the status of a log analysis job (for future async implementation)"
 )
-async def get_analysis_status(analysis_id: str) -> AnalysisStatusResponse:
+async def get_analysis_status(
+    analysis_id: str,
+    service: Annotated[AnalysisService, Depends(get_analysis_service)]
+) -> AnalysisStatusResponse:
     """
     Get the status of a log analysis job.
 
@@ -126,20 +147,13 @@ async def get_analysis_status(analysis_id: str) -> AnalysisStatusResponse:
 
     Args:
         analysis_id: The analysis ID to check
+        service: Shared analysis service instance
 
     Returns:
         Status information for the analysis
     """
     try:
-        service = AnalysisService()
-        status_info = service.get_analysis_status(analysis_id)
-
-        return AnalysisStatusResponse(
-            status="completed",
-            analysis_id=analysis_id,
-            message="Analysis completed",
-            progress_percentage=100
-        )
+        return AnalysisStatusResponse(**service.get_analysis_status(analysis_id))
 
     except Exception as e:
         logger.error(
@@ -160,55 +174,66 @@ async def get_analysis_status(analysis_id: str) -> AnalysisStatusResponse:
     summary="Get quick log statistics",
     description="Get quick statistics about logs without full analysis"
 )
-async def get_quick_stats(hours_back: int = 24):
+async def get_quick_stats(
+    response: Response,
+    client: Annotated[GCPLoggingClient, Depends(get_gcp_logging_client)],
+    hours_back: int = 24
+):
     """
     Get quick statistics about logs without performing full analysis.
 
     This is a lightweight endpoint that just fetches log counts and severity distribution.
+    Results are cached briefly per project and time range; the ``X-Cache`` response
+    header reports whether the cache was hit.
 
     Args:
+        response: Outgoing response, used to set the cache header
+        client: Shared GCP Logging client instance
         hours_back: Number of hours to look back (default: 24)
 
     Returns:
         Log statistics
     """
-    try:
-        from app.integrations.gcp import GCPLoggingClient
-
-        logger.info(
-            "Fetching quick log statistics",
-            extra={"hours_back": hours_back}
-        )
-
-        client = GCPLoggingClient()
-        stats = client.get_log_statistics(hours_back=hours_back)
+    cache_key = (client.settings.gcp_project_id, hours_back)
+
+    stats = _stats_cache.get(cache_key)
+    if stats is not None:
+        response.headers["X-Cache"] = "HIT"
+    else:
+        fetch = _stats_in_flight.get(cache_key)
+        if fetch is None:
+            logger.info(
+                "Fetching quick log statistics",
+                extra={"hours_back": hours_back}
+            )
+            fetch = asyncio.create_task(_fetch_stats(client, cache_key, hours_back))
+            _stats_in_flight[cache_key] = fetch
+            fetch.add_done_callback(lambda _: _stats_in_flight.pop(cache_key, None))
+        # Shield the shared fetch so one disconnecting caller doesn't cancel it for the rest
+        stats = await asyncio.shield(fetch)
+        response.headers["X-Cache"] = "MISS"
+
+    return {
+        "success": True,
+        "data": stats
+    }
+
+
+async def _fetch_stats(
+    client: GCPLoggingClient,
+    cache_key: tuple[str | None, int],
+    hours_back: int
+) -> dict[str, Any]:
+    """Fetch log statistics and store them in the quick-stats cache.
 
-        return {
-            "success": True,
-            "data": stats
-        }
+    Args:
+        client: Shared GCP Logging client instance
+        cache_key: Quick-stats cache key (project ID, hours back)
+        hours_back: Number of hours to look back
 
-    except GCPIntegrationError as e:
-        logger.error(
-            "Failed to fetch log statistics",
-            extra={"error": str(e)}
-        )
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail={
-                "error": "Failed to fetch statistics",
-                "message": e.message
-            }
-        )
-    except Exception as e:
-        logger.error(
-            "Unexpected error fetching statistics",
-            extra={"error": str(e)}
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "error": "Internal server error",
-                "message": str(e)
-            }
-        )
+    Returns:
+        Log statistics
+    """
+    stats = await client.get_log_statistics(hours_back=hours_back)
+    _stats_cache[cache_key] = stats
+    return stats
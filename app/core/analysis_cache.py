@@ -0,0 +1,135 @@
+"""Two-level cache for completed log analyses."""
+
+import asyncio
+import hashlib
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from cachetools import TLRUCache
+
+from app.core.config import get_settings
+from app.core.persistent_cache import PersistentCache
+
+
+class AnalysisKeyBuilder:
+    """Builds an analysis cache key incrementally as logs stream in."""
+
+    def __init__(self, request_data: dict[str, Any]):
+        """Start a cache key for an analysis request.
+
+        Args:
+            request_data: Analysis request parameters
+        """
+        self._digest = hashlib.sha256(orjson.dumps(request_data, option=orjson.OPT_SORT_KEYS))
+
+    def add_log(self, log: dict[str, Any]) -> None:
+        """Add a log entry the analysis runs on to the key.
+
+        Args:
+            log: Log entry
+        """
+        self._digest.update(orjson.dumps(log, option=orjson.OPT_SORT_KEYS))
+
+    def key(self) -> str:
+        """Get the cache key for the request and logs added so far.
+
+        Returns:
+            SHA256 hex digest of the request parameters and log content
+        """
+        return self._digest.hexdigest()
+
+
+class AnalysisCache:
+    """TTL cache of serialized analysis responses keyed by request and log content.
+
+    An in-memory cache is checked first, backed by an optional SQLite cache
+    that survives restarts. Entries loaded from SQLite keep their remaining
+    lifetime rather than starting a fresh TTL in memory.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: int,
+        persistent: PersistentCache | None = None
+    ):
+        """Initialize the analysis cache.
+
+        Args:
+            maxsize: Maximum number of analyses kept in memory
+            ttl: Seconds before a cached analysis expires
+            persistent: Optional persistent cache used behind the in-memory one
+        """
+        self.ttl = ttl
+        # Values are (payload, seconds to live) so each entry can expire on its own schedule
+        self._cache: TLRUCache[str, tuple[bytes, float]] = TLRUCache(
+            maxsize=maxsize,
+            ttu=_expires_at
+        )
+        self.persistent = persistent
+
+    async def get(self, key: str) -> bytes | None:
+        """Get a cached analysis.
+
+        The persistent cache is only queried on an in-memory miss, in a worker
+        thread so SQLite I/O doesn't block the event loop.
+
+        Args:
+            key: Cache key from AnalysisKeyBuilder
+
+        Returns:
+            Serialized analysis response, or None on a miss
+        """
+        entry = self._cache.get(key)
+        if entry is None and self.persistent is not None:
+            entry = await asyncio.to_thread(self.persistent.get_entry, key)
+            if entry is not None:
+                # Entries with no lifetime left are skipped by the cache
+                self._cache[key] = entry
+        return entry[0] if entry else None
+
+    async def set(self, key: str, payload: bytes) -> None:
+        """Store an analysis in the cache.
+
+        The persistent cache is written in a worker thread so SQLite I/O
+        doesn't block the event loop.
+
+        Args:
+            key: Cache key from AnalysisKeyBuilder
+            payload: Serialized analysis response
+        """
+        self._cache[key] = (payload, self.ttl)
+        if self.persistent is not None:
+            await asyncio.to_thread(self.persistent.set, key, payload)
+
+
+def _expires_at(key: str, value: tuple[bytes, float], now: float) -> float:
+    """Get when an in-memory cache entry expires.
+
+    Args:
+        key: Cache key
+        value: Tuple of (payload, seconds to live)
+        now: Current cache timer value
+
+    Returns:
+        Cache timer value at which the entry expires
+    """
+    return now + value[1]
+
+
+@lru_cache
+def get_analysis_cache() -> AnalysisCache:
+    """Get cached analysis cache instance."""
+    settings = get_settings()
+    persistent = None
+    if settings.analysis_cache_db_path:
+        persistent = PersistentCache(
+            settings.analysis_cache_db_path,
+            ttl=settings.analysis_cache_ttl
+        )
+    return AnalysisCache(
+        maxsize=settings.analysis_cache_size,
+        ttl=settings.analysis_cache_ttl,
+        persistent=persistent
+    )
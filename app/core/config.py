@@ -19,12 +19,16 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     port: int = 8000
     host: str = "0.0.0.0"
+    allowed_origins: list[str] = ["http://localhost:3000"]  # CORS origins (JSON list in env)
 
     # GCP Configuration
     gcp_project_id: str | None = None
     gcp_credentials_json: str | None = None  # Path to credentials file or JSON string
     gcp_log_filter: str = ""  # Cloud Logging filter query
     gcp_log_limit: int = 100  # Number of logs to fetch per request
+    gcp_channel_pool_size: int = 10  # gRPC channels to round-robin log requests across
+    gcp_request_timeout: float = 30.0  # Seconds allowed for a whole Cloud Logging query
+    gcp_stats_limit: int = 10000  # Max logs counted for log statistics
 
     # AI/LLM Configuration
     openai_api_key: str | None = None
@@ -32,10 +36,20 @@ class Settings(BaseSettings):
     llm_provider: str = "openai"  # "openai" or "anthropic"
     llm_model: str = "gpt-4"  # Model to use for analysis
     llm_temperature: float = 0.7
+    llm_chunk_size: int = 25  # Logs sent to the LLM per request
+    llm_concurrency: int = 4  # Max concurrent LLM requests per analysis
+    llm_cache_size: int = 256  # LLM results kept for repeated sets of log messages
+    llm_cache_ttl: int = 3600  # Seconds before a cached LLM result expires
+    llm_hedge: bool = False  # Race both providers and use the first response
+    llm_hedge_model: str | None = None  # Model for the non-primary provider when hedging
 
     # Analysis Configuration
     analysis_output_dir: str = "analysis_reports"
     max_log_entries_to_analyze: int = 50
+    quick_stats_cache_ttl: int = 60  # Seconds to cache /quick-stats results
+    analysis_cache_size: int = 500  # Max analyses kept in the response cache
+    analysis_cache_ttl: int = 3600  # Seconds before a cached analysis expires
+    analysis_cache_db_path: str | None = "analysis_reports/analysis_cache.db"  # Unset to disable
 
 
 @lru_cache
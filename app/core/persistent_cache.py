@@ -0,0 +1,119 @@
+"""SQLite-backed cache that keeps completed analyses across restarts."""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from app.core.logging import logger
+
+
+class PersistentCache:
+    """SQLite cache of serialized analysis responses with a TTL."""
+
+    def __init__(self, path: str, ttl: int):
+        """Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite database file
+            ttl: Seconds before a cached entry expires
+        """
+        self.ttl = ttl
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        # Autocommit mode; the lock serializes access from worker threads
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            # WAL lets readers proceed while a write is in progress
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, "
+                "created_at INTEGER NOT NULL, "
+                "payload BLOB NOT NULL)"
+            )
+
+    def get(self, key: str) -> bytes | None:
+        """Get an unexpired cached payload.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached payload, or None on a miss
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key: str) -> tuple[bytes, int] | None:
+        """Get an unexpired cached payload with its remaining lifetime.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (cached payload, seconds until it expires), or None on a miss
+        """
+        now = int(time.time())
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM cache WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl)
+            ).fetchone()
+        return (row[0], row[1] + self.ttl - now) if row else None
+
+    def set(self, key: str, payload: bytes) -> None:
+        """Store a payload, replacing any existing entry for the key.
+
+        Args:
+            key: Cache key
+            payload: Serialized analysis response
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, created_at, payload) VALUES (?, ?, ?)",
+                (key, int(time.time()), payload)
+            )
+
+    def purge_expired(self) -> int:
+        """Delete expired entries.
+
+        Returns:
+            Number of deleted entries
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE created_at < ?",
+                (int(time.time()) - self.ttl,)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    async def purge_periodically(self, interval: int) -> None:
+        """Purge expired entries in the background until cancelled.
+
+        Args:
+            interval: Seconds between purges
+        """
+        while True:
+            try:
+                deleted = await asyncio.to_thread(self.purge_expired)
+                if deleted:
+                    logger.info(
+                        "Purged expired analyses from persistent cache",
+                        extra={"deleted": deleted}
+                    )
+            except sqlite3.Error as e:
+                logger.error(
+                    "Failed to purge persistent cache",
+                    extra={"error": str(e)}
+                )
+            await asyncio.sleep(interval)
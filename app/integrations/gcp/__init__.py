@@ -1,5 +1,5 @@
 """Google Cloud Platform integration."""
 
-from app.integrations.gcp.logging_client import GCPLoggingClient
+from app.integrations.gcp.logging_client import GCPLoggingClient, get_gcp_logging_client
 
-__all__ = ["GCPLoggingClient"]
+__all__ = ["GCPLoggingClient", "get_gcp_logging_client"]
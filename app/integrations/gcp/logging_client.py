@@ -1,10 +1,22 @@
 """GCP Cloud Logging integration client."""
 
-import json
-from datetime import datetime, timedelta
+import asyncio
+import itertools
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any
 
-from google.cloud import logging
+import orjson
+from cachetools import LRUCache
+from google.cloud.logging_v2.services.logging_service_v2 import LoggingServiceV2AsyncClient
+from google.cloud.logging_v2.services.logging_service_v2.transports import (
+    LoggingServiceV2GrpcAsyncIOTransport,
+)
+from google.cloud.logging_v2.types import ListLogEntriesRequest
+from google.logging.type.log_severity_pb2 import LogSeverity
 from google.oauth2 import service_account
 
 from app.core.config import get_settings
@@ -12,17 +24,44 @@ from app.core.exceptions import GCPIntegrationError
 from app.core.logging import logger
 
 
+# Filter selecting warning and error logs
+ERROR_LOG_FILTER = 'severity >= "WARNING"'
+
+# Largest page size the Cloud Logging API accepts
+_MAX_PAGE_SIZE = 1000
+
+# Builds each log entry dictionary field from a GCP LogEntry message
+_ENTRY_FIELDS: dict[str, Callable[["GCPLoggingClient", Any], Any]] = {
+    "timestamp": lambda client, entry: entry.timestamp.isoformat() if entry.timestamp else None,
+    "severity": lambda client, entry: LogSeverity.Name(entry.severity),
+    "log_name": lambda client, entry: entry.log_name,
+    "resource": lambda client, entry: client._format_resource(entry.resource),
+    "text_payload": lambda client, entry: entry.text_payload or None,
+    "json_payload": lambda client, entry: (
+        _to_builtin(entry.json_payload) if entry.json_payload else None
+    ),
+    "labels": lambda client, entry: dict(entry.labels),
+    "insert_id": lambda client, entry: entry.insert_id,
+}
+
+
 class GCPLoggingClient:
     """Client for fetching logs from GCP Cloud Logging."""
 
     def __init__(self):
         """Initialize the GCP Logging client."""
         self.settings = get_settings()
-        self.client = None
+        self.clients: list[LoggingServiceV2AsyncClient] = []
+        self._resource_cache: LRUCache = LRUCache(maxsize=1024)
         self._initialize_client()
 
     def _initialize_client(self) -> None:
-        """Initialize the GCP logging client with credentials."""
+        """Initialize a pool of GCP logging clients with credentials.
+
+        Each client owns its own gRPC channel and connection, so requests are
+        spread across connections instead of queueing behind a single
+        connection's concurrent stream limit.
+        """
         try:
             if not self.settings.gcp_project_id:
                 raise GCPIntegrationError(
@@ -31,34 +70,40 @@ class GCPLoggingClient:
                 )
 
             # Initialize with credentials if provided
-            if self.settings.gcp_credentials_json:
-                try:
-                    # Try to load as JSON file path first
-                    credentials = service_account.Credentials.from_service_account_file(
-                        self.settings.gcp_credentials_json
-                    )
-                except FileNotFoundError:
-                    # If not a file, try to parse as JSON string
-                    credentials_dict = json.loads(self.settings.gcp_credentials_json)
+            credentials = None
+            credentials_json = self.settings.gcp_credentials_json
+            if credentials_json:
+                if credentials_json.lstrip().startswith("{"):
+                    # Inline JSON string
                     credentials = service_account.Credentials.from_service_account_info(
-                        credentials_dict
+                        orjson.loads(credentials_json)
+                    )
+                else:
+                    # Path to a JSON credentials file
+                    credentials = service_account.Credentials.from_service_account_file(
+                        credentials_json
                     )
 
-                self.client = logging.Client(
-                    project=self.settings.gcp_project_id,
-                    credentials=credentials
-                )
-            else:
-                # Use default credentials (e.g., from GCE metadata server)
-                self.client = logging.Client(
-                    project=self.settings.gcp_project_id
+            # Without explicit credentials, each client falls back to the
+            # default credentials (e.g., from GCE metadata server)
+            self.clients = [
+                LoggingServiceV2AsyncClient(
+                    transport=_create_transport(credentials, channel_index)
                 )
+                for channel_index in range(max(1, self.settings.gcp_channel_pool_size))
+            ]
+            self._client_cycle = itertools.cycle(self.clients)
 
             logger.info(
                 "GCP Logging client initialized",
-                extra={"project_id": self.settings.gcp_project_id}
+                extra={
+                    "project_id": self.settings.gcp_project_id,
+                    "pool_size": len(self.clients)
+                }
             )
 
+        except GCPIntegrationError:
+            raise
         except Exception as e:
             logger.error(
                 "Failed to initialize GCP Logging client",
@@ -70,7 +115,7 @@ class GCPLoggingClient:
                 {"error": str(e)}
             ) from e
 
-    def fetch_logs(
+    async def fetch_logs(
         self,
         filter_query: str | None = None,
         hours_back: int = 24,
@@ -89,61 +134,60 @@ class GCPLoggingClient:
         Raises:
             GCPIntegrationError: If log fetching fails
         """
-        if not self.client:
-            raise GCPIntegrationError(
-                "GCP Logging client not initialized",
-                "GCP_CLIENT_NOT_INITIALIZED"
-            )
+        log_entries = [
+            log_entry
+            async for log_entry in self.fetch_logs_stream(filter_query, hours_back, max_results)
+        ]
+
+        logger.info(
+            "Successfully fetched logs from GCP",
+            extra={"count": len(log_entries)}
+        )
 
-        try:
-            # Build the filter
-            timestamp_filter = self._build_timestamp_filter(hours_back)
+        return log_entries
 
-            # Combine with user-provided filter
-            if filter_query:
-                full_filter = f"{timestamp_filter} AND {filter_query}"
-            elif self.settings.gcp_log_filter:
-                full_filter = f"{timestamp_filter} AND {self.settings.gcp_log_filter}"
-            else:
-                full_filter = timestamp_filter
+    async def fetch_logs_stream(
+        self,
+        filter_query: str | None = None,
+        hours_back: int = 24,
+        max_results: int | None = None,
+        fields: Sequence[str] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream logs from GCP Cloud Logging one entry at a time.
 
-            logger.info(
-                "Fetching logs from GCP",
-                extra={
-                    "filter": full_filter,
-                    "hours_back": hours_back,
-                    "max_results": max_results or self.settings.gcp_log_limit
-                }
-            )
+        Entries are formatted as they arrive, so callers that only aggregate
+        over the logs never hold the full result set in memory.
 
-            # Fetch logs
-            entries = self.client.list_entries(
-                filter_=full_filter,
-                page_size=max_results or self.settings.gcp_log_limit
-            )
+        Args:
+            filter_query: Cloud Logging filter query (optional)
+            hours_back: Number of hours to look back (default: 24)
+            max_results: Maximum number of log entries to return (default: from settings)
+            fields: Log entry keys to include (default: all)
 
-            # Convert to list of dictionaries
-            log_entries = []
-            for entry in entries:
-                log_entry = {
-                    "timestamp": entry.timestamp.isoformat() if entry.timestamp else None,
-                    "severity": entry.severity,
-                    "log_name": entry.log_name,
-                    "resource": self._format_resource(entry.resource),
-                    "text_payload": entry.payload if isinstance(entry.payload, str) else None,
-                    "json_payload": entry.payload if isinstance(entry.payload, dict) else None,
-                    "labels": entry.labels,
-                    "insert_id": entry.insert_id,
-                }
-                log_entries.append(log_entry)
+        Yields:
+            Log entries as dictionaries
 
-            logger.info(
-                "Successfully fetched logs from GCP",
-                extra={"count": len(log_entries)}
+        Raises:
+            GCPIntegrationError: If log fetching fails
+        """
+        fields = fields or tuple(_ENTRY_FIELDS)
+        unknown_fields = set(fields) - _ENTRY_FIELDS.keys()
+        if unknown_fields:
+            raise GCPIntegrationError(
+                f"Unknown log entry fields: {sorted(unknown_fields)}",
+                "GCP_UNKNOWN_LOG_FIELDS"
             )
 
-            return log_entries
-
+        try:
+            async for entry in self._iter_entries(
+                filter_query,
+                hours_back,
+                max_results or self.settings.gcp_log_limit
+            ):
+                yield self._format_entry(entry, fields)
+
+        except GCPIntegrationError:
+            raise
         except Exception as e:
             logger.error(
                 "Failed to fetch logs from GCP",
@@ -155,7 +199,98 @@ class GCPLoggingClient:
                 {"error": str(e)}
             ) from e
 
-    def fetch_error_logs(
+    async def _iter_entries(
+        self,
+        filter_query: str | None = None,
+        hours_back: int = 24,
+        max_results: int | None = None
+    ) -> AsyncIterator[Any]:
+        """Iterate over raw Cloud Logging entries without formatting them.
+
+        Entries are returned newest first, and iteration stops once
+        max_results entries have been yielded so no further pages are read.
+        Fetching all pages must finish within the configured request timeout.
+
+        Args:
+            filter_query: Cloud Logging filter query (optional)
+            hours_back: Number of hours to look back
+            max_results: Maximum number of entries to yield (default: no limit)
+
+        Yields:
+            GCP LogEntry messages
+
+        Raises:
+            GCPIntegrationError: If the query does not finish within the timeout
+        """
+        if not self.clients:
+            raise GCPIntegrationError(
+                "GCP Logging client not initialized",
+                "GCP_CLIENT_NOT_INITIALIZED"
+            )
+
+        # Build the filter
+        timestamp_filter = _timestamp_filter(int(time.time()) // 60, hours_back)
+
+        # Combine with user-provided filter
+        if filter_query:
+            full_filter = f"{timestamp_filter} AND {filter_query}"
+        elif self.settings.gcp_log_filter:
+            full_filter = f"{timestamp_filter} AND {self.settings.gcp_log_filter}"
+        else:
+            full_filter = timestamp_filter
+
+        logger.info(
+            "Fetching logs from GCP",
+            extra={
+                "filter": full_filter,
+                "hours_back": hours_back,
+                "max_results": max_results
+            }
+        )
+
+        # The per-call timeout only covers the first page; later pages are
+        # fetched without one, so bound the whole query with one deadline
+        timeout = self.settings.gcp_request_timeout
+        deadline = asyncio.get_running_loop().time() + timeout
+        try:
+            async with asyncio.timeout_at(deadline):
+                pager = await self._next_client().list_log_entries(
+                    request=ListLogEntriesRequest(
+                        resource_names=[f"projects/{self.settings.gcp_project_id}"],
+                        filter=full_filter,
+                        order_by="timestamp desc",
+                        page_size=min(max_results or _MAX_PAGE_SIZE, _MAX_PAGE_SIZE)
+                    ),
+                    timeout=timeout
+                )
+
+            count = 0
+            pages = aiter(pager.pages)
+            while True:
+                # Only the page fetch is under the deadline, not the caller's work
+                # between yields
+                async with asyncio.timeout_at(deadline):
+                    page = await anext(pages, None)
+                if page is None:
+                    return
+                for entry in page.entries:
+                    yield entry
+                    count += 1
+                    if count == max_results:
+                        return
+
+        except TimeoutError as e:
+            logger.error(
+                "Cloud Logging query timed out",
+                extra={"filter": full_filter, "timeout": timeout}
+            )
+            raise GCPIntegrationError(
+                f"Cloud Logging query did not finish within {timeout} seconds",
+                "GCP_REQUEST_TIMEOUT",
+                {"timeout": timeout}
+            ) from e
+
+    async def fetch_error_logs(
         self,
         hours_back: int = 24,
         max_results: int | None = None
@@ -169,25 +304,31 @@ class GCPLoggingClient:
         Returns:
             List of error/warning log entries
         """
-        error_filter = 'severity >= "WARNING"'
-        return self.fetch_logs(
-            filter_query=error_filter,
+        return await self.fetch_logs(
+            filter_query=ERROR_LOG_FILTER,
             hours_back=hours_back,
             max_results=max_results
         )
 
-    def _build_timestamp_filter(self, hours_back: int) -> str:
-        """Build a timestamp filter for Cloud Logging.
+    def _next_client(self) -> LoggingServiceV2AsyncClient:
+        """Get the next client from the pool in round-robin order.
+
+        Returns:
+            Logging client to dispatch the next request on
+        """
+        return next(self._client_cycle)
+
+    def _format_entry(self, entry: Any, fields: Sequence[str]) -> dict[str, Any]:
+        """Format a Cloud Logging entry to a dictionary.
 
         Args:
-            hours_back: Number of hours to look back
+            entry: GCP LogEntry message
+            fields: Log entry keys to include
 
         Returns:
-            Timestamp filter string
+            Dictionary representation of the log entry
         """
-        start_time = datetime.utcnow() - timedelta(hours=hours_back)
-        # Format: timestamp >= "2024-01-01T00:00:00Z"
-        return f'timestamp >= "{start_time.strftime("%Y-%m-%dT%H:%M:%SZ")}"'
+        return {field: _ENTRY_FIELDS[field](self, entry) for field in fields}
 
     def _format_resource(self, resource: Any) -> dict[str, Any]:
         """Format a log resource object to a dictionary.
@@ -201,17 +342,27 @@ class GCPLoggingClient:
         if not resource:
             return {}
 
-        return {
-            "type": resource.type if hasattr(resource, "type") else None,
-            "labels": dict(resource.labels) if hasattr(resource, "labels") else {}
-        }
+        resource_type = resource.type if hasattr(resource, "type") else None
+        labels = resource.labels if hasattr(resource, "labels") else {}
 
-    def get_log_statistics(
+        # Entries from the same workload share one resource dict; treat it as read-only.
+        # The labels are only copied when the resource is first seen
+        key = (resource_type, tuple(sorted(labels.items())))
+        formatted: dict[str, Any] | None = self._resource_cache.get(key)
+        if formatted is None:
+            formatted = {"type": resource_type, "labels": dict(labels)}
+            self._resource_cache[key] = formatted
+        return formatted
+
+    async def get_log_statistics(
         self,
         hours_back: int = 24
     ) -> dict[str, Any]:
         """Get statistics about logs (count by severity).
 
+        At most ``gcp_stats_limit`` of the newest entries are counted, so the
+        counts cover the most recent part of very busy windows.
+
         Args:
             hours_back: Number of hours to look back
 
@@ -219,21 +370,22 @@ class GCPLoggingClient:
             Dictionary with log statistics
         """
         try:
-            logs = self.fetch_logs(hours_back=hours_back)
-
-            stats = {
-                "total_count": len(logs),
-                "by_severity": {},
+            # Count severities straight off the raw entries; no need to format them
+            by_severity: Counter[str] = Counter()
+            async for entry in self._iter_entries(
+                hours_back=hours_back,
+                max_results=self.settings.gcp_stats_limit
+            ):
+                by_severity[LogSeverity.Name(entry.severity)] += 1
+
+            return {
+                "total_count": by_severity.total(),
+                "by_severity": dict(by_severity),
                 "time_range_hours": hours_back
             }
 
-            # Count by severity
-            for log in logs:
-                severity = log.get("severity", "UNKNOWN")
-                stats["by_severity"][severity] = stats["by_severity"].get(severity, 0) + 1
-
-            return stats
-
+        except GCPIntegrationError:
+            raise
         except Exception as e:
             logger.error(
                 "Failed to get log statistics",
@@ -244,3 +396,74 @@ class GCPLoggingClient:
                 "GCP_STATS_ERROR",
                 {"error": str(e)}
             ) from e
+
+
+def _create_transport(
+    credentials: Any,
+    channel_index: int
+) -> LoggingServiceV2GrpcAsyncIOTransport:
+    """Create a logging transport on a channel that gets its own connection.
+
+    gRPC shares connections between channels created with the same target and
+    options, so every pooled channel uses a local subchannel pool and a
+    distinct channel ID.
+
+    Args:
+        credentials: Service account credentials, or None for the defaults
+        channel_index: Position of the channel in the pool
+
+    Returns:
+        Transport for a LoggingServiceV2AsyncClient
+    """
+    channel = LoggingServiceV2GrpcAsyncIOTransport.create_channel(
+        credentials=credentials,
+        options=[
+            ("grpc.max_send_message_length", -1),
+            ("grpc.max_receive_message_length", -1),
+            ("grpc.use_local_subchannel_pool", 1),
+            ("grpc.channel_id", channel_index),
+        ]
+    )
+    return LoggingServiceV2GrpcAsyncIOTransport(channel=channel)
+
+
+@lru_cache(maxsize=256)
+def _timestamp_filter(minute_bucket: int, hours_back: int) -> str:
+    """Build a timestamp filter for Cloud Logging.
+
+    The start time is truncated to the minute so back-to-back requests reuse
+    the cached filter string.
+
+    Args:
+        minute_bucket: Current time as whole minutes since the epoch
+        hours_back: Number of hours to look back
+
+    Returns:
+        Timestamp filter string
+    """
+    start_time = datetime.fromtimestamp(minute_bucket * 60, tz=timezone.utc)
+    start_time -= timedelta(hours=hours_back)
+    # Format: timestamp >= "2024-01-01T00:00:00Z"
+    return f'timestamp >= "{start_time.strftime("%Y-%m-%dT%H:%M:%SZ")}"'
+
+
+def _to_builtin(value: Any) -> Any:
+    """Convert proto-plus map/repeated composites to plain Python containers.
+
+    Args:
+        value: Value from a protobuf Struct field
+
+    Returns:
+        Equivalent value built from dicts and lists
+    """
+    if isinstance(value, Mapping):
+        return {key: _to_builtin(item) for key, item in value.items()}
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return [_to_builtin(item) for item in value]
+    return value
+
+
+@lru_cache
+def get_gcp_logging_client() -> GCPLoggingClient:
+    """Get cached GCP Logging client instance."""
+    return GCPLoggingClient()
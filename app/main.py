@@ -1,11 +1,27 @@
 """Main FastAPI application."""
 
-from fastapi import FastAPI
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import Any
+
+import orjson
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from app.core.analysis_cache import get_analysis_cache
 from app.core.config import get_settings
+from app.core.exceptions import (
+    OnCallAgentError,
+    GCPIntegrationError,
+    LogAnalysisError,
+    LLMError
+)
 from app.core.logging import setup_logging, logger
 from app.api.routes import analysis
+from app.integrations.gcp import get_gcp_logging_client
+from app.services.analysis_service import get_analysis_service
 
 
 # Setup logging
@@ -14,56 +30,127 @@ setup_logging()
 # Get settings
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run application startup and shutdown."""
+    # Build the shared clients now so the first request doesn't pay for
+    # credential loading and gRPC channel setup
+    try:
+        get_gcp_logging_client()
+        get_analysis_service()
+    except OnCallAgentError as e:
+        logger.warning(
+            "Skipping service preload; integration not configured",
+            extra={"error": e.message, "code": e.code}
+        )
+
+    # Expire persisted analyses in the background
+    purge_task = None
+    analysis_cache = get_analysis_cache()
+    if analysis_cache.persistent is not None:
+        purge_task = asyncio.create_task(
+            analysis_cache.persistent.purge_periodically(settings.analysis_cache_ttl)
+        )
+
+    # Build and cache the OpenAPI schema now instead of on the first docs request
+    app.openapi()
+
+    logger.info(
+        "Starting OnCall Agent",
+        extra={
+            "environment": settings.environment,
+            "port": settings.port
+        }
+    )
+
+    yield
+
+    if purge_task is not None:
+        purge_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await purge_task
+    if analysis_cache.persistent is not None:
+        analysis_cache.persistent.close()
+
+    logger.info("Shutting down OnCall Agent")
+
+
 # Create FastAPI app
 app = FastAPI(
     title="OnCall Agent - GCP Log Analysis",
     description="Intelligent log analysis and automated fix suggestions for GCP logs",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Run on application startup."""
-    logger.info(
-        "Starting OnCall Agent",
-        extra={
-            "environment": settings.environment,
-            "port": settings.port
-        }
-    )
+# Status code and error label returned for each domain exception
+_ERROR_RESPONSES: dict[type[OnCallAgentError], tuple[int, str]] = {
+    GCPIntegrationError: (status.HTTP_502_BAD_GATEWAY, "GCP integration failed"),
+    LLMError: (status.HTTP_502_BAD_GATEWAY, "LLM analysis failed"),
+    LogAnalysisError: (status.HTTP_500_INTERNAL_SERVER_ERROR, "Analysis failed"),
+}
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Run on application shutdown."""
-    logger.info("Shutting down OnCall Agent")
+@app.exception_handler(OnCallAgentError)
+async def oncall_agent_error_handler(
+    request: Request,
+    exc: OnCallAgentError
+) -> ORJSONResponse:
+    """Translate domain exceptions into JSON error responses."""
+    status_code, error = _ERROR_RESPONSES.get(
+        type(exc),
+        (status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error")
+    )
+    logger.error(
+        error,
+        extra={"error": exc.message, "code": exc.code, "path": request.url.path}
+    )
+    return ORJSONResponse(
+        status_code=status_code,
+        content={
+            "detail": {
+                "error": error,
+                "message": exc.message,
+                "code": exc.code
+            }
+        }
+    )
 
 
-@app.get("/health")
-async def health_check():
-    """Basic health check endpoint."""
-    return {
-        "status": "healthy",
-        "service": "oncall-agent",
-        "version": "0.1.0"
-    }
+@app.exception_handler(Exception)
+async def unexpected_error_handler(request: Request, exc: Exception) -> ORJSONResponse:
+    """Return a JSON error response for unhandled exceptions."""
+    logger.error(
+        "Unexpected error",
+        extra={"error": str(exc), "path": request.url.path}
+    )
+    return ORJSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={
+            "detail": {
+                "error": "Internal server error",
+                "message": str(exc)
+            }
+        }
+    )
 
 
-@app.get("/health/ready")
-async def readiness_check():
-    """Readiness probe - checks dependencies."""
+def _build_readiness() -> dict[str, Any]:
+    """Build the readiness payload from the (static) settings."""
     checks = {
         "api": "ready",
     }
@@ -86,5 +173,26 @@ async def readiness_check():
     }
 
 
+# Probe responses never change for the life of the process, so serialize them once
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "oncall-agent",
+    "version": "0.1.0"
+})
+_READINESS_BYTES = orjson.dumps(_build_readiness())
+
+
+@app.get("/health")
+async def health_check() -> Response:
+    """Basic health check endpoint."""
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
+
+
+@app.get("/health/ready")
+async def readiness_check() -> Response:
+    """Readiness probe - checks dependencies."""
+    return Response(content=_READINESS_BYTES, media_type="application/json")
+
+
 # Include routers
 app.include_router(analysis.router, prefix="/api/v1")
@@ -3,12 +3,15 @@
 from datetime import datetime
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class LogAnalysisRequest(BaseModel):
     """Request schema for log analysis."""
 
+    # Build the validator at import time so the first request doesn't pay for it
+    model_config = ConfigDict(extra="forbid", defer_build=False)
+
     hours_back: int = Field(
         default=24,
         ge=1,
@@ -86,6 +89,14 @@ class LogAnalysisResponse(BaseModel):
     )
 
 
+class AnalysisErrorResponse(BaseModel):
+    """Error entry for an analysis that failed within a batch."""
+
+    error: str = Field(description="Short description of the failure")
+    message: str = Field(description="Detailed error message")
+    code: str | None = Field(default=None, description="Error code")
+
+
 class AnalysisStatusResponse(BaseModel):
     """Status response for analysis job."""
 
@@ -1,23 +1,37 @@
 """Log analysis service - orchestrates log fetching, analysis, and reporting."""
 
+import asyncio
 import os
 import uuid
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.analysis_cache import AnalysisKeyBuilder, get_analysis_cache
 from app.core.config import get_settings
 from app.core.exceptions import LogAnalysisError
 from app.core.logging import logger
-from app.integrations.gcp import GCPLoggingClient
+from app.integrations.gcp import get_gcp_logging_client
+from app.integrations.gcp.logging_client import ERROR_LOG_FILTER
 from app.schemas.analysis import (
     LogAnalysisRequest,
     LogAnalysisResponse,
     LogStatistics,
     AnalysisFinding
 )
-from app.services.llm_service import LLMService
-from app.services.document_service import DocumentService
+from app.services.llm_service import get_llm_service
+from app.services.document_service import get_document_service
+
+
+# Validates a whole list of LLM findings in a single call
+_FINDINGS_ADAPTER = TypeAdapter(list[AnalysisFinding])
+
+# Validates LLM-supplied string lists (recommendations, common errors)
+_STRINGS_ADAPTER = TypeAdapter(list[str])
 
 
 class AnalysisService:
@@ -26,9 +40,10 @@ class AnalysisService:
     def __init__(self):
         """Initialize the analysis service."""
         self.settings = get_settings()
-        self.gcp_client = GCPLoggingClient()
-        self.llm_service = LLMService()
-        self.document_service = DocumentService()
+        self.gcp_client = get_gcp_logging_client()
+        self.llm_service = get_llm_service()
+        self.document_service = get_document_service()
+        self.cache = get_analysis_cache()
 
         # Ensure output directory exists
         Path(self.settings.analysis_output_dir).mkdir(parents=True, exist_ok=True)
@@ -48,8 +63,8 @@ class AnalysisService:
         Raises:
             LogAnalysisError: If analysis fails at any step
         """
-        analysis_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow()
+        analysis_id = uuid.uuid4().hex
+        timestamp = datetime.now(timezone.utc)
 
         try:
             logger.info(
@@ -61,49 +76,77 @@ class AnalysisService:
                 }
             )
 
-            # Step 1: Fetch logs from GCP
-            logs = self._fetch_logs(request)
+            # Step 1: Stream logs from GCP, computing statistics as they arrive
+            logs, statistics, cache_key = await self._collect_logs(request)
 
-            if not logs:
+            if not statistics["total_count"]:
                 logger.warning("No logs found for analysis")
                 return self._create_empty_response(analysis_id, timestamp, request)
 
-            # Step 2: Get log statistics
-            statistics = self._calculate_statistics(logs, request.hours_back)
+            # Identical requests over identical logs reuse the earlier analysis
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(
+                    "Returning cached log analysis",
+                    extra={"analysis_id": analysis_id, "cache_key": cache_key}
+                )
+                return LogAnalysisResponse.model_validate_json(cached)
 
-            # Step 3: Analyze logs with LLM
-            llm_analysis = self.llm_service.analyze_logs(logs, statistics)
+            # Step 2: Analyze logs with LLM
+            llm_analysis = await self.llm_service.analyze_logs(logs, statistics)
 
-            # Step 4: Convert to response format
+            # Step 3: Convert to response format, validating everything the LLM supplied
             findings = self._convert_findings(llm_analysis.get("findings", []))
+            summary = llm_analysis.get("summary", "")
+            if not isinstance(summary, str):
+                logger.warning(
+                    "Discarding non-string LLM summary",
+                    extra={"analysis_id": analysis_id, "summary": summary}
+                )
+                summary = ""
+            recommendations = self._convert_strings(
+                llm_analysis.get("recommendations", []),
+                "recommendations"
+            )
+            log_statistics = LogStatistics(
+                total_logs=statistics["total_count"],
+                by_severity=statistics["by_severity"],
+                time_range_hours=statistics["time_range_hours"],
+                most_common_errors=self._convert_strings(
+                    llm_analysis.get("most_common_errors", []),
+                    "most_common_errors"
+                )
+            )
 
-            # Step 5: Generate document
-            document_path = self.document_service.generate_document(
+            # Step 4: Generate document off the event loop (blocking file I/O)
+            document_path = await asyncio.to_thread(
+                self.document_service.generate_document,
                 analysis_id=analysis_id,
                 timestamp=timestamp,
                 statistics=statistics,
                 findings=findings,
-                summary=llm_analysis.get("summary", ""),
-                recommendations=llm_analysis.get("recommendations", []),
+                summary=summary,
+                recommendations=recommendations,
                 output_format=request.output_format
             )
 
-            # Step 6: Create response
-            response = LogAnalysisResponse(
+            # Step 5: Create response
+            # The LLM-supplied parts were validated above and the rest is built
+            # here, so skip re-validating the whole model
+            response = LogAnalysisResponse.model_construct(
                 analysis_id=analysis_id,
                 timestamp=timestamp,
-                statistics=LogStatistics(
-                    total_logs=statistics["total_count"],
-                    by_severity=statistics["by_severity"],
-                    time_range_hours=statistics["time_range_hours"],
-                    most_common_errors=llm_analysis.get("most_common_errors", [])
-                ),
+                statistics=log_statistics,
                 findings=findings,
-                summary=llm_analysis.get("summary", ""),
+                summary=summary,
                 document_path=document_path,
-                recommendations=llm_analysis.get("recommendations", [])
+                recommendations=recommendations
             )
 
+            # Don't pin a placeholder analysis from an unparseable LLM reply
+            if not llm_analysis.get("parse_failed"):
+                await self.cache.set(cache_key, response.model_dump_json().encode())
+
             logger.info(
                 "Log analysis completed successfully",
                 extra={
@@ -129,52 +172,49 @@ class AnalysisService:
                 {"analysis_id": analysis_id, "error": str(e)}
             ) from e
 
-    def _fetch_logs(self, request: LogAnalysisRequest) -> list[dict[str, Any]]:
-        """Fetch logs based on request parameters.
+    async def _collect_logs(
+        self,
+        request: LogAnalysisRequest
+    ) -> tuple[list[dict[str, Any]], dict[str, Any], str]:
+        """Stream logs for a request in a single pass.
+
+        Statistics and the cache key cover every fetched log, but only the
+        logs that will be sent to the LLM are kept in memory.
 
         Args:
             request: Log analysis request
 
         Returns:
-            List of log entries
+            Tuple of (logs to analyze, statistics, cache key)
         """
+        filter_query: str | None
         if request.focus_on_errors:
-            return self.gcp_client.fetch_error_logs(
-                hours_back=request.hours_back,
-                max_results=request.max_logs
-            )
+            filter_query = ERROR_LOG_FILTER
         else:
-            return self.gcp_client.fetch_logs(
-                filter_query=request.filter_query,
-                hours_back=request.hours_back,
-                max_results=request.max_logs
-            )
-
-    def _calculate_statistics(
-        self,
-        logs: list[dict[str, Any]],
-        hours_back: int
-    ) -> dict[str, Any]:
-        """Calculate statistics from logs.
-
-        Args:
-            logs: List of log entries
-            hours_back: Time range in hours
-
-        Returns:
-            Statistics dictionary
-        """
-        stats = {
-            "total_count": len(logs),
-            "by_severity": {},
-            "time_range_hours": hours_back
+            filter_query = request.filter_query
+
+        max_to_analyze = self.settings.max_log_entries_to_analyze
+        logs: list[dict[str, Any]] = []
+        by_severity: Counter[str] = Counter()
+        key_builder = AnalysisKeyBuilder(request.model_dump())
+
+        async for log in self.gcp_client.fetch_logs_stream(
+            filter_query=filter_query,
+            hours_back=request.hours_back,
+            max_results=request.max_logs
+        ):
+            by_severity[log.get("severity", "UNKNOWN")] += 1
+            key_builder.add_log(log)
+            if len(logs) < max_to_analyze:
+                logs.append(log)
+
+        statistics = {
+            "total_count": by_severity.total(),
+            "by_severity": dict(by_severity),
+            "time_range_hours": request.hours_back
         }
 
-        for log in logs:
-            severity = log.get("severity", "UNKNOWN")
-            stats["by_severity"][severity] = stats["by_severity"].get(severity, 0) + 1
-
-        return stats
+        return logs, statistics, key_builder.key()
 
     def _convert_findings(
         self,
@@ -188,25 +228,65 @@ class AnalysisService:
         Returns:
             List of AnalysisFinding objects
         """
-        findings = []
+        normalized = []
         for finding in llm_findings:
-            try:
-                findings.append(AnalysisFinding(
-                    severity=finding.get("severity", "info"),
-                    title=finding.get("title", "Unknown issue"),
-                    description=finding.get("description", ""),
-                    affected_logs_count=finding.get("affected_logs_count", 0),
-                    suggested_fix=finding.get("suggested_fix", ""),
-                    code_example=finding.get("code_example")
-                ))
-            except Exception as e:
+            if not isinstance(finding, dict):
                 logger.warning(
                     "Failed to convert finding",
-                    extra={"error": str(e), "finding": finding}
+                    extra={"error": "Finding is not an object", "finding": finding}
                 )
                 continue
+            normalized.append({
+                "severity": finding.get("severity", "info"),
+                "title": finding.get("title", "Unknown issue"),
+                "description": finding.get("description", ""),
+                "affected_logs_count": finding.get("affected_logs_count", 0),
+                "suggested_fix": finding.get("suggested_fix", ""),
+                "code_example": finding.get("code_example")
+            })
+
+        # Validate every finding in one call; only fall back to dropping
+        # malformed findings when the LLM returned some
+        try:
+            return _FINDINGS_ADAPTER.validate_python(normalized)
+        except ValidationError as e:
+            errors_by_index: dict[int, list[str]] = {}
+            for error in e.errors():
+                # Errors in a list are located by the item's index first
+                index = int(error["loc"][0])
+                errors_by_index.setdefault(index, []).append(error["msg"])
+
+            for index, messages in errors_by_index.items():
+                logger.warning(
+                    "Failed to convert finding",
+                    extra={"error": "; ".join(messages), "finding": normalized[index]}
+                )
+
+            return _FINDINGS_ADAPTER.validate_python([
+                finding for index, finding in enumerate(normalized)
+                if index not in errors_by_index
+            ])
 
-        return findings
+    def _convert_strings(self, values: Any, field: str) -> list[str]:
+        """Validate a list of strings supplied by the LLM.
+
+        Args:
+            values: Raw value from the LLM response
+            field: Name of the LLM response field, for logging
+
+        Returns:
+            The values that are strings
+        """
+        try:
+            return _STRINGS_ADAPTER.validate_python(values)
+        except ValidationError as e:
+            logger.warning(
+                "Dropping invalid LLM output",
+                extra={"field": field, "error": str(e)}
+            )
+            if not isinstance(values, list):
+                return []
+            return [value for value in values if isinstance(value, str)]
 
     def _create_empty_response(
         self,
@@ -224,10 +304,10 @@ class AnalysisService:
         Returns:
             Empty analysis response
         """
-        return LogAnalysisResponse(
+        return LogAnalysisResponse.model_construct(
             analysis_id=analysis_id,
             timestamp=timestamp,
-            statistics=LogStatistics(
+            statistics=LogStatistics.model_construct(
                 total_logs=0,
                 by_severity={},
                 time_range_hours=request.hours_back,
@@ -252,5 +332,12 @@ class AnalysisService:
         return {
             "analysis_id": analysis_id,
             "status": "completed",
-            "message": "Analysis completed"
+            "message": "Analysis completed",
+            "progress_percentage": 100
         }
+
+
+@lru_cache
+def get_analysis_service() -> AnalysisService:
+    """Get cached analysis service instance."""
+    return AnalysisService()
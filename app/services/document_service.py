@@ -1,10 +1,12 @@
 """Document generation service for analysis reports."""
 
-import json
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from app.core.config import get_settings
 from app.core.logging import logger
 from app.schemas.analysis import AnalysisFinding
@@ -211,9 +213,8 @@ class DocumentService:
             "recommendations": recommendations
         }
 
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(document, f, indent=2, ensure_ascii=False)
+        # Write to file (orjson emits UTF-8 without escaping non-ASCII)
+        output_path.write_bytes(orjson.dumps(document, option=orjson.OPT_INDENT_2))
 
         logger.info(
             "Generated JSON document",
@@ -239,3 +240,9 @@ class DocumentService:
             "info": "ℹ️"
         }
         return emoji_map.get(severity.lower(), "⚪")
+
+
+@lru_cache
+def get_document_service() -> DocumentService:
+    """Get cached document service instance."""
+    return DocumentService()
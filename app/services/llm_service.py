@@ -1,9 +1,18 @@
 """LLM service for AI-powered analysis."""
 
+import asyncio
+import hashlib
 import json
+import re
+from collections import Counter
+from functools import lru_cache
 from typing import Any
 
+import orjson
+from cachetools import TTLCache
 from langchain.prompts import ChatPromptTemplate
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import SystemMessage
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 
@@ -12,6 +21,19 @@ from app.core.exceptions import LLMError
 from app.core.logging import logger
 
 
+# Bump when the prompts change so cached LLM results are discarded
+_PROMPT_VERSION = 1
+
+# Markdown code fence LLMs sometimes wrap their JSON response in
+_CODE_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(?P<body>.*?)\s*```\s*$", re.DOTALL)
+
+# Hex IDs, UUIDs and numbers that vary between otherwise identical messages
+_VARIABLE_TOKEN_RE = re.compile(r"\b[0-9a-f-]{8,}\b|\d+", re.IGNORECASE)
+
+# Most common error patterns kept when merging chunked analyses
+_MAX_COMMON_ERRORS = 10
+
+
 class LLMService:
     """Service for interacting with LLM providers (OpenAI, Anthropic)."""
 
@@ -19,6 +41,21 @@ class LLMService:
         """Initialize the LLM service."""
         self.settings = get_settings()
         self.llm = self._initialize_llm()
+        self.hedge_llm = self._initialize_hedge_llm()
+
+        # Parsed results for previously seen sets of log messages
+        self._result_cache: TTLCache = TTLCache(
+            maxsize=self.settings.llm_cache_size,
+            ttl=self.settings.llm_cache_ttl
+        )
+
+        # The system prompt is constant, so build the template once. It is
+        # passed as a message rather than a template so the braces in its
+        # JSON example aren't parsed as template variables.
+        self._prompt_template = ChatPromptTemplate.from_messages([
+            SystemMessage(content=self._get_system_prompt()),
+            ("human", "{user_msg}")
+        ])
 
     def _initialize_llm(self):
         """Initialize the appropriate LLM based on configuration."""
@@ -55,44 +92,103 @@ class LLMService:
                 {"error": str(e)}
             ) from e
 
-    def analyze_logs(
+    def _initialize_hedge_llm(self) -> BaseChatModel | None:
+        """Initialize the other provider's LLM to race against the primary one.
+
+        Returns:
+            Chat model for the non-primary provider, or None if hedging is
+            disabled or both API keys aren't configured
+        """
+        if not self.settings.llm_hedge:
+            return None
+
+        if not (self.settings.openai_api_key and self.settings.anthropic_api_key):
+            logger.warning("LLM hedging requires both OpenAI and Anthropic API keys; disabled")
+            return None
+
+        try:
+            if self.settings.llm_provider == "anthropic":
+                logger.info("Initializing OpenAI LLM for hedged requests")
+                return ChatOpenAI(
+                    model=self.settings.llm_hedge_model or "gpt-4",
+                    api_key=self.settings.openai_api_key,
+                    temperature=self.settings.llm_temperature
+                )
+            else:
+                logger.info("Initializing Anthropic LLM for hedged requests")
+                return ChatAnthropic(
+                    model_name=self.settings.llm_hedge_model or "claude-3-sonnet-20240229",
+                    anthropic_api_key=self.settings.anthropic_api_key,
+                    temperature=self.settings.llm_temperature
+                )
+        except Exception as e:
+            logger.error(f"Failed to initialize hedge LLM: {str(e)}")
+            raise LLMError(
+                f"Failed to initialize hedge LLM: {str(e)}",
+                "LLM_INIT_ERROR",
+                {"error": str(e)}
+            ) from e
+
+    async def analyze_logs(
         self,
         logs: list[dict[str, Any]],
         statistics: dict[str, Any]
     ) -> dict[str, Any]:
         """Analyze logs using LLM and generate findings.
 
+        Repeated messages are collapsed into one entry with an occurrence
+        count. The remaining entries are split into chunks that are analyzed
+        concurrently, and the per-chunk results are merged into a single
+        analysis.
+
         Args:
             logs: List of log entries to analyze
             statistics: Statistics about the logs
 
         Returns:
-            Dictionary containing analysis results with findings and recommendations
+            Dictionary containing analysis results with findings and recommendations.
+            ``parse_failed`` is set to True when an LLM response could not be
+            parsed, in which case the result should not be cached.
 
         Raises:
             LLMError: If LLM analysis fails
         """
         try:
+            # Limit number of logs to analyze
+            logs_to_analyze = logs[:self.settings.max_log_entries_to_analyze]
+            log_groups = self._group_logs(logs_to_analyze)
+
+            # The same log messages seen again get the same analysis
+            cache_key = self._result_cache_key(log_groups, statistics)
+            cached: dict[str, Any] | None = self._result_cache.get(cache_key)
+            if cached is not None:
+                logger.info(
+                    "Returning cached LLM analysis",
+                    extra={"cache_key": cache_key}
+                )
+                return cached
+
+            chunks = self._chunk_logs(log_groups)
+
             logger.info(
                 "Starting LLM log analysis",
-                extra={"log_count": len(logs)}
+                extra={
+                    "log_count": len(logs_to_analyze),
+                    "unique_count": len(log_groups),
+                    "chunk_count": len(chunks)
+                }
             )
 
-            # Prepare log data for analysis
-            log_summary = self._prepare_log_summary(logs)
-
-            # Create the analysis prompt
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", self._get_system_prompt()),
-                ("human", self._get_analysis_prompt(log_summary, statistics))
-            ])
+            semaphore = asyncio.Semaphore(max(1, self.settings.llm_concurrency))
+            results = await asyncio.gather(*(
+                self._analyze_chunk(chunk, start, statistics, semaphore)
+                for chunk, start in chunks
+            ))
 
-            # Get LLM response
-            chain = prompt | self.llm
-            response = chain.invoke({})
-
-            # Parse the response
-            analysis_result = self._parse_llm_response(response.content)
+            analysis_result = self._merge_results(results)
+            # A reply that couldn't be parsed may well parse on the next try
+            if not analysis_result.get("parse_failed"):
+                self._result_cache[cache_key] = analysis_result
 
             logger.info("LLM analysis completed successfully")
             return analysis_result
@@ -108,39 +204,282 @@ class LLMService:
                 {"error": str(e)}
             ) from e
 
-    def _prepare_log_summary(self, logs: list[dict[str, Any]]) -> str:
-        """Prepare a summary of logs for LLM analysis.
+    def _group_logs(
+        self,
+        logs: list[dict[str, Any]]
+    ) -> list[tuple[dict[str, Any], int]]:
+        """Collapse logs with the same severity and message.
 
         Args:
             logs: List of log entries
 
         Returns:
-            Formatted string summary of logs
+            List of (first log in the group, group size) tuples in log order
         """
-        # Limit number of logs to analyze
-        max_logs = self.settings.max_log_entries_to_analyze
-        logs_to_analyze = logs[:max_logs]
+        counts: Counter[tuple[str, str]] = Counter()
+        samples: dict[tuple[str, str], dict[str, Any]] = {}
+        for log in logs:
+            fingerprint = _fingerprint(log)
+            counts[fingerprint] += 1
+            samples.setdefault(fingerprint, log)
+
+        return [(log, counts[fingerprint]) for fingerprint, log in samples.items()]
 
-        summary_parts = []
-        for i, log in enumerate(logs_to_analyze, 1):
-            log_text = f"Log #{i}:\n"
-            log_text += f"  Timestamp: {log.get('timestamp', 'N/A')}\n"
-            log_text += f"  Severity: {log.get('severity', 'N/A')}\n"
-            log_text += f"  Log Name: {log.get('log_name', 'N/A')}\n"
+    def _result_cache_key(
+        self,
+        log_groups: list[tuple[dict[str, Any], int]],
+        statistics: dict[str, Any]
+    ) -> str:
+        """Build the result cache key for a set of log groups.
 
-            # Include payload
-            if log.get('text_payload'):
-                log_text += f"  Message: {log['text_payload']}\n"
-            elif log.get('json_payload'):
-                log_text += f"  JSON: {json.dumps(log['json_payload'], indent=2)}\n"
+        The key covers everything the prompt is built from (the distinct log
+        messages, how often each was seen, and the statistics) and the model
+        settings, including the hedge model, so a change of volume, model,
+        temperature or prompts never reuses a stale result.
 
-            # Include resource info
-            if log.get('resource'):
-                log_text += f"  Resource Type: {log['resource'].get('type', 'N/A')}\n"
+        Args:
+            log_groups: List of (log entry, occurrence count) tuples
+            statistics: Log statistics included in the prompt
 
-            summary_parts.append(log_text)
+        Returns:
+            Hex digest identifying the analysis input
+        """
+        group_counts = sorted((_fingerprint(log), count) for log, count in log_groups)
+        # With hedging on, the result may come from the hedge model instead
+        hedge = None
+        if self.hedge_llm is not None:
+            hedge = [type(self.hedge_llm).__name__, self.settings.llm_hedge_model]
+        return hashlib.blake2b(
+            orjson.dumps(
+                [
+                    self.settings.llm_provider,
+                    self.settings.llm_model,
+                    hedge,
+                    self.settings.llm_temperature,
+                    _PROMPT_VERSION,
+                    group_counts,
+                    statistics
+                ],
+                option=orjson.OPT_SORT_KEYS
+            ),
+            digest_size=16
+        ).hexdigest()
+
+    def _chunk_logs(
+        self,
+        log_groups: list[tuple[dict[str, Any], int]]
+    ) -> list[tuple[list[tuple[dict[str, Any], int]], int]]:
+        """Split log groups into chunks for concurrent analysis.
+
+        Args:
+            log_groups: List of (log entry, occurrence count) tuples
+
+        Returns:
+            List of (chunk, number of the chunk's first log) tuples
+        """
+        chunk_size = max(1, self.settings.llm_chunk_size)
+        return [
+            (log_groups[i:i + chunk_size], i + 1)
+            for i in range(0, len(log_groups), chunk_size)
+        ] or [([], 1)]
+
+    async def _analyze_chunk(
+        self,
+        log_groups: list[tuple[dict[str, Any], int]],
+        start: int,
+        statistics: dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> dict[str, Any]:
+        """Analyze one chunk of logs with the LLM.
+
+        Args:
+            log_groups: (log entry, occurrence count) tuples in the chunk
+            start: Number of the chunk's first log within the whole analysis
+            statistics: Statistics about all logs being analyzed
+            semaphore: Limits concurrent LLM requests
+
+        Returns:
+            Parsed analysis results for the chunk
+        """
+        # Prepare log data for analysis
+        log_summary = self._prepare_log_summary(log_groups, start)
 
-        return "\n".join(summary_parts)
+        # Get LLM response without blocking the event loop
+        async with semaphore:
+            response = await self._invoke({
+                "user_msg": self._get_analysis_prompt(log_summary, statistics)
+            })
+
+        # Parse the response
+        return self._parse_llm_response(response.content)
+
+    async def _invoke(self, inputs: dict[str, Any]) -> Any:
+        """Run the analysis prompt, racing both providers when hedging.
+
+        The first successful response wins and the other request is
+        cancelled. If a provider fails, the other one is still awaited.
+
+        Args:
+            inputs: Prompt template variables
+
+        Returns:
+            Chat model response message
+
+        Raises:
+            Exception: The last provider error if every provider fails
+        """
+        if self.hedge_llm is None:
+            return await (self._prompt_template | self.llm).ainvoke(inputs)
+
+        pending = {
+            asyncio.create_task((self._prompt_template | llm).ainvoke(inputs))
+            for llm in (self.llm, self.hedge_llm)
+        }
+        errors: list[BaseException] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    errors.append(error)
+                    logger.warning(
+                        "Hedged LLM request failed",
+                        extra={"error": str(error)}
+                    )
+            raise errors[-1]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _merge_results(self, results: list[Any]) -> dict[str, Any]:
+        """Merge per-chunk analysis results into a single analysis.
+
+        Args:
+            results: Parsed analysis results, one per chunk
+
+        Returns:
+            Combined analysis results
+        """
+        normalized = [
+            result for result in map(self._normalize_result, results)
+            if result is not None
+        ]
+        if len(normalized) == 1:
+            return normalized[0]
+
+        error_counts: Counter[str] = Counter()
+        for result in normalized:
+            error_counts.update(result["most_common_errors"])
+
+        merged: dict[str, Any] = {
+            "summary": " ".join(result["summary"] for result in normalized if result["summary"]),
+            "findings": [finding for result in normalized for finding in result["findings"]],
+            # Chunks often repeat the same advice; keep the first occurrence
+            "recommendations": list(dict.fromkeys(
+                recommendation
+                for result in normalized
+                for recommendation in result["recommendations"]
+            )),
+            "most_common_errors": [
+                error for error, _ in error_counts.most_common(_MAX_COMMON_ERRORS)
+            ]
+        }
+        if any(result.get("parse_failed") for result in normalized):
+            merged["parse_failed"] = True
+        return merged
+
+    def _normalize_result(self, result: Any) -> dict[str, Any] | None:
+        """Coerce one chunk's parsed LLM response to the expected field types.
+
+        The LLM doesn't always follow the requested format, so fields of the
+        wrong type are replaced rather than failing the whole analysis.
+
+        Args:
+            result: Parsed analysis results for a chunk
+
+        Returns:
+            Result with a string summary, a list of finding dicts and lists of
+            strings, or None if the response is not a JSON object
+        """
+        if not isinstance(result, dict):
+            logger.warning(
+                "Dropping LLM chunk result that is not a JSON object",
+                extra={"result": str(result)[:500]}
+            )
+            return None
+
+        summary = result.get("summary")
+        findings = result.get("findings")
+        return {
+            **result,
+            "summary": summary if isinstance(summary, str) else "",
+            "findings": (
+                [finding for finding in findings if isinstance(finding, dict)]
+                if isinstance(findings, list) else []
+            ),
+            "recommendations": _to_strings(result.get("recommendations")),
+            "most_common_errors": _to_strings(result.get("most_common_errors"))
+        }
+
+    def _prepare_log_summary(
+        self,
+        log_groups: list[tuple[dict[str, Any], int]],
+        start: int = 1
+    ) -> str:
+        """Prepare a summary of logs for LLM analysis.
+
+        Args:
+            log_groups: List of (log entry, occurrence count) tuples
+            start: Number given to the first log (default: 1)
+
+        Returns:
+            Formatted string summary of logs
+        """
+        return "\n".join(
+            self._format_log(i, log, count)
+            for i, (log, count) in enumerate(log_groups, start)
+        )
+
+    def _format_log(self, number: int, log: dict[str, Any], count: int) -> str:
+        """Format a single log entry for the analysis prompt.
+
+        Args:
+            number: Number of the log within the analysis
+            log: Log entry
+            count: Number of occurrences of the log's message
+
+        Returns:
+            Formatted log entry
+        """
+        # Include payload
+        if log.get('text_payload'):
+            payload = f"  Message: {log['text_payload']}\n"
+        elif log.get('json_payload'):
+            # Compact JSON; indentation multiplies the tokens sent to the LLM
+            payload = f"  JSON: {json.dumps(log['json_payload'])}\n"
+        else:
+            payload = ""
+
+        # Include resource info
+        if log.get('resource'):
+            resource = f"  Resource Type: {log['resource'].get('type', 'N/A')}\n"
+        else:
+            resource = ""
+
+        seen = f" (seen {count} times)" if count > 1 else ""
+
+        return (
+            f"Log #{number}{seen}:\n"
+            f"  Timestamp: {log.get('timestamp', 'N/A')}\n"
+            f"  Severity: {log.get('severity', 'N/A')}\n"
+            f"  Log Name: {log.get('log_name', 'N/A')}\n"
+            f"{payload}{resource}"
+        )
 
     def _get_system_prompt(self) -> str:
         """Get the system prompt for log analysis."""
@@ -210,55 +549,102 @@ Provide your analysis in the specified JSON format."""
             response: Raw LLM response text
 
         Returns:
-            Parsed analysis results
-
-        Raises:
-            LLMError: If parsing fails
+            Parsed analysis results. If the response is not a JSON object, a
+            placeholder analysis with ``parse_failed`` set to True.
         """
+        # Try to extract JSON from the response
+        # LLMs sometimes wrap JSON in markdown code blocks
+        match = _CODE_FENCE_RE.match(response)
+        response = match.group("body") if match else response.strip()
+
         try:
-            # Try to extract JSON from the response
-            # LLMs sometimes wrap JSON in markdown code blocks
-            response = response.strip()
-
-            if response.startswith("```json"):
-                response = response[7:]  # Remove ```json
-            if response.startswith("```"):
-                response = response[3:]  # Remove ```
-            if response.endswith("```"):
-                response = response[:-3]  # Remove trailing ```
-
-            response = response.strip()
-
-            # Parse JSON
-            result = json.loads(response)
-
-            # Validate required fields
-            if "summary" not in result:
-                result["summary"] = "Analysis completed"
-            if "findings" not in result:
-                result["findings"] = []
-            if "recommendations" not in result:
-                result["recommendations"] = []
-            if "most_common_errors" not in result:
-                result["most_common_errors"] = []
-
-            return result
-
-        except json.JSONDecodeError as e:
+            result = orjson.loads(response)
+        except orjson.JSONDecodeError as e:
             logger.error(
                 "Failed to parse LLM response as JSON",
                 extra={"error": str(e), "response": response[:500]}
             )
-            # Return a basic structure if parsing fails
-            return {
-                "summary": "Analysis completed but response parsing failed",
-                "findings": [{
-                    "severity": "info",
-                    "title": "Analysis Result",
-                    "description": response[:1000],
-                    "affected_logs_count": 0,
-                    "suggested_fix": "Manual review required"
-                }],
-                "recommendations": ["Review logs manually"],
-                "most_common_errors": []
-            }
+            return self._unparsed_response(response)
+
+        if not isinstance(result, dict):
+            logger.error(
+                "LLM response is not a JSON object",
+                extra={"response": response[:500]}
+            )
+            return self._unparsed_response(response)
+
+        # Validate required fields
+        if "summary" not in result:
+            result["summary"] = "Analysis completed"
+        if "findings" not in result:
+            result["findings"] = []
+        if "recommendations" not in result:
+            result["recommendations"] = []
+        if "most_common_errors" not in result:
+            result["most_common_errors"] = []
+
+        return result
+
+    def _unparsed_response(self, response: str) -> dict[str, Any]:
+        """Build the placeholder analysis for a response that couldn't be parsed.
+
+        Args:
+            response: LLM response text
+
+        Returns:
+            Analysis asking for manual review, flagged with ``parse_failed``
+        """
+        return {
+            "summary": "Analysis completed but response parsing failed",
+            "findings": [{
+                "severity": "info",
+                "title": "Analysis Result",
+                "description": response[:1000],
+                "affected_logs_count": 0,
+                "suggested_fix": "Manual review required"
+            }],
+            "recommendations": ["Review logs manually"],
+            "most_common_errors": [],
+            "parse_failed": True
+        }
+
+
+def _to_strings(value: Any) -> list[str]:
+    """Coerce an LLM-supplied list of strings.
+
+    Args:
+        value: Raw field value from the LLM response
+
+    Returns:
+        The string items of a list, a lone string as a one-item list, or an
+        empty list for anything else
+    """
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, str)]
+    return []
+
+
+def _fingerprint(log: dict[str, Any]) -> tuple[str, str]:
+    """Build a fingerprint that matches repeats of the same log message.
+
+    Args:
+        log: Log entry
+
+    Returns:
+        Tuple of (severity, message with variable tokens masked)
+    """
+    if log.get("text_payload"):
+        message = log["text_payload"]
+    elif log.get("json_payload"):
+        message = json.dumps(log["json_payload"], sort_keys=True)
+    else:
+        message = ""
+    return log.get("severity", "UNKNOWN"), _VARIABLE_TOKEN_RE.sub("?", message)
+
+
+@lru_cache
+def get_llm_service() -> LLMService:
+    """Get cached LLM service instance."""
+    return LLMService()
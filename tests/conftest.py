@@ -1,14 +1,49 @@
 """Pytest configuration and fixtures."""
 
 import pytest
-from unittest.mock import Mock, AsyncMock
+from collections import Counter, defaultdict
+from unittest.mock import Mock, AsyncMock, NonCallableMock
 from datetime import datetime
+from types import SimpleNamespace
 
+from google.logging.type.log_severity_pb2 import LogSeverity
 
-@pytest.fixture
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection(session):
+    """Fail collection if a test module builds mocks at import time.
+
+    Mock construction belongs in fixtures so that it only runs for the tests
+    that are executed, not on every (including --collect-only) collection.
+    """
+    created = []
+    original_new = NonCallableMock.__new__
+
+    def counting_new(cls, *args, **kwargs):
+        created.append(cls.__name__)
+        return original_new(cls, *args, **kwargs)
+
+    NonCallableMock.__new__ = counting_new
+    try:
+        yield
+    finally:
+        NonCallableMock.__new__ = original_new
+
+    if created:
+        raise pytest.UsageError(
+            f"{len(created)} mock(s) created during collection; "
+            "build mocks inside fixtures instead"
+        )
+
+
+# The data fixtures below are session-scoped and shared between tests;
+# treat them as read-only
+
+
+@pytest.fixture(scope="session")
 def mock_gcp_logs():
     """Mock GCP log entries."""
-    return [
+    return (
         {
             "timestamp": "2024-01-15T10:30:00Z",
             "severity": "ERROR",
@@ -39,10 +74,62 @@ def mock_gcp_logs():
             "labels": {},
             "insert_id": "test-id-3"
         }
-    ]
+    )
+
+
+@pytest.fixture(scope="session")
+def mock_gcp_log_entries(mock_gcp_logs):
+    """Cloud Logging LogEntry stand-ins for mock_gcp_logs."""
+    # Logs from the same resource share one resource object
+    resources: dict[tuple, SimpleNamespace] = {}
+    entries = []
+    for log in mock_gcp_logs:
+        resource_type = log["resource"]["type"]
+        resource_labels = log["resource"]["labels"]
+        key = (resource_type, tuple(sorted(resource_labels.items())))
+        resource = resources.get(key)
+        if resource is None:
+            resource = resources[key] = SimpleNamespace(
+                type=resource_type,
+                labels=resource_labels
+            )
+
+        entries.append(SimpleNamespace(
+            # Python 3.11+ parses the trailing "Z" directly
+            timestamp=datetime.fromisoformat(log["timestamp"]),
+            severity=LogSeverity.Value(log["severity"]),
+            log_name=log["log_name"],
+            text_payload=log["text_payload"],
+            json_payload=log["json_payload"],
+            labels=log["labels"],
+            insert_id=log["insert_id"],
+            resource=resource
+        ))
+    return entries
+
+
+@pytest.fixture(scope="session")
+def mock_gcp_log_entries_by_severity(mock_gcp_logs, mock_gcp_log_entries):
+    """mock_gcp_log_entries grouped by severity name, in log order."""
+    by_severity = defaultdict(list)
+    for entry, log in zip(mock_gcp_log_entries, mock_gcp_logs, strict=True):
+        by_severity[log["severity"]].append(entry)
+    return dict(by_severity)
+
+
+@pytest.fixture(scope="session")
+def mock_gcp_error_entries(mock_gcp_log_entries_by_severity):
+    """Cloud Logging LogEntry stand-ins for the ERROR entries of mock_gcp_logs."""
+    return mock_gcp_log_entries_by_severity["ERROR"]
+
+
+@pytest.fixture(scope="session")
+def mock_gcp_severity_counts(mock_gcp_logs):
+    """Number of mock_gcp_logs entries per severity name."""
+    return Counter(log["severity"] for log in mock_gcp_logs)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_llm_analysis():
     """Mock LLM analysis result."""
     return {
@@ -77,7 +164,7 @@ def mock_llm_analysis():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_log_statistics():
     """Mock log statistics."""
     return {
@@ -0,0 +1,13 @@
+"""Pytest fixtures for API integration tests."""
+
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """HTTP client bound to the app, shared across the session."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
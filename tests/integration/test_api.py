@@ -1,51 +1,36 @@
 """Integration tests for API endpoints."""
 
+import asyncio
+
 import pytest
-from httpx import AsyncClient
-from unittest.mock import patch, AsyncMock
+from datetime import datetime, timezone
+from unittest.mock import Mock, AsyncMock
 
 from app.main import app
+from app.schemas.analysis import AnalysisFinding, LogAnalysisResponse, LogStatistics
+from app.services.analysis_service import get_analysis_service
 
 
-@pytest.mark.asyncio
-async def test_health_check():
-    """Test the health check endpoint."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.get("/health")
-
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "healthy"
-    assert data["service"] == "oncall-agent"
-
-
-@pytest.mark.asyncio
-async def test_readiness_check():
-    """Test the readiness check endpoint."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.get("/health/ready")
-
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "ready"
-    assert "checks" in data
+# Share the session-scoped client's event loop
+pytestmark = pytest.mark.asyncio(scope="session")
 
 
-@pytest.mark.asyncio
-@patch("app.api.routes.analysis.AnalysisService")
-async def test_analyze_logs_endpoint(mock_service_class, mock_gcp_logs, mock_llm_analysis):
-    """Test the log analysis endpoint."""
-    # Arrange
+@pytest.fixture
+def mock_analysis_service():
+    """Override the shared analysis service with a mock."""
     mock_service = AsyncMock()
-    mock_service_class.return_value = mock_service
+    mock_service.get_analysis_status = Mock()
+    app.dependency_overrides[get_analysis_service] = lambda: mock_service
+    yield mock_service
+    app.dependency_overrides.clear()
 
-    # Mock the analysis response
-    from datetime import datetime
-    from app.schemas.analysis import LogAnalysisResponse, LogStatistics, AnalysisFinding
 
-    mock_response = LogAnalysisResponse(
+@pytest.fixture(scope="module")
+def mock_analysis_response():
+    """Analysis response shared by the tests in this module (treat as read-only)."""
+    return LogAnalysisResponse(
         analysis_id="test-123",
-        timestamp=datetime.utcnow(),
+        timestamp=datetime.now(timezone.utc),
         statistics=LogStatistics(
             total_logs=3,
             by_severity={"ERROR": 2, "WARNING": 1},
@@ -66,18 +51,41 @@ async def test_analyze_logs_endpoint(mock_service_class, mock_gcp_logs, mock_llm
         recommendations=["Test recommendation"]
     )
 
-    mock_service.analyze_logs.return_value = mock_response
+
+async def test_health_check(client):
+    """Test the health check endpoint."""
+    response = await client.get("/health")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    assert data["service"] == "oncall-agent"
+
+
+async def test_readiness_check(client):
+    """Test the readiness check endpoint."""
+    response = await client.get("/health/ready")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert "checks" in data
+
+
+async def test_analyze_logs_endpoint(client, mock_analysis_service, mock_analysis_response):
+    """Test the log analysis endpoint."""
+    # Arrange: mock the analysis response
+    mock_analysis_service.analyze_logs.return_value = mock_analysis_response
 
     # Act
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.post(
-            "/api/v1/analysis/",
-            json={
-                "hours_back": 24,
-                "focus_on_errors": True,
-                "output_format": "markdown"
-            }
-        )
+    response = await client.post(
+        "/api/v1/analysis/",
+        json={
+            "hours_back": 24,
+            "focus_on_errors": True,
+            "output_format": "markdown"
+        }
+    )
 
     # Assert
     assert response.status_code == 200
@@ -86,30 +94,145 @@ async def test_analyze_logs_endpoint(mock_service_class, mock_gcp_logs, mock_llm
     assert data["statistics"]["total_logs"] == 3
     assert len(data["findings"]) == 1
     assert data["findings"][0]["title"] == "Test Finding"
+    assert "code_example" not in data["findings"][0]
 
 
-@pytest.mark.asyncio
-async def test_analyze_logs_validation_error():
+async def test_analyze_logs_validation_error(client, mock_analysis_service):
     """Test that invalid input returns validation error."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.post(
-            "/api/v1/analysis/",
-            json={
-                "hours_back": 200,  # Exceeds max of 168
-                "focus_on_errors": True
-            }
-        )
+    response = await client.post(
+        "/api/v1/analysis/",
+        json={
+            "hours_back": 200,  # Exceeds max of 168
+            "focus_on_errors": True
+        }
+    )
 
     assert response.status_code == 422  # Validation error
 
 
-@pytest.mark.asyncio
-async def test_get_analysis_status():
+async def test_analyze_logs_rejects_unknown_fields(client, mock_analysis_service):
+    """Test that unknown request fields are rejected."""
+    response = await client.post(
+        "/api/v1/analysis/",
+        json={"hours_back": 24, "hours": 12}
+    )
+
+    assert response.status_code == 422
+
+
+async def test_analyze_logs_gcp_error(client, mock_analysis_service):
+    """Test that GCP integration errors map to a 502 error envelope."""
+    from app.core.exceptions import GCPIntegrationError
+
+    mock_analysis_service.analyze_logs.side_effect = GCPIntegrationError(
+        "Failed to fetch logs",
+        "GCP_LOG_FETCH_ERROR"
+    )
+
+    response = await client.post("/api/v1/analysis/", json={"hours_back": 24})
+
+    assert response.status_code == 502
+    detail = response.json()["detail"]
+    assert detail["error"] == "GCP integration failed"
+    assert detail["code"] == "GCP_LOG_FETCH_ERROR"
+
+
+async def test_analyze_logs_batch(client, mock_analysis_service, mock_analysis_response):
+    """Test that a failed analysis in a batch does not abort the others."""
+    from app.core.exceptions import LogAnalysisError
+
+    mock_analysis_service.analyze_logs.side_effect = [
+        mock_analysis_response,
+        LogAnalysisError("Log analysis failed", "ANALYSIS_ERROR")
+    ]
+
+    response = await client.post(
+        "/api/v1/analysis/batch",
+        json=[{"hours_back": 24}, {"hours_back": 6}]
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 2
+    assert data[0]["analysis_id"] == "test-123"
+    assert "code_example" not in data[0]["findings"][0]
+    assert data[1]["code"] == "ANALYSIS_ERROR"
+
+
+async def test_get_analysis_status(client, mock_analysis_service):
     """Test getting analysis status."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.get("/api/v1/analysis/status/test-123")
+    mock_analysis_service.get_analysis_status.return_value = {
+        "analysis_id": "test-123",
+        "status": "completed",
+        "message": "Analysis completed",
+        "progress_percentage": 100
+    }
+
+    response = await client.get("/api/v1/analysis/status/test-123")
 
     assert response.status_code == 200
     data = response.json()
     assert data["analysis_id"] == "test-123"
     assert data["status"] == "completed"
+
+
+async def test_quick_stats_cached(client, mock_log_statistics):
+    """Test that repeated quick-stats requests are served from cache."""
+    from app.api.routes.analysis import _stats_cache
+    from app.integrations.gcp import get_gcp_logging_client
+
+    mock_client = Mock()
+    mock_client.settings.gcp_project_id = "test-project"
+    mock_client.get_log_statistics = AsyncMock(return_value=mock_log_statistics)
+    app.dependency_overrides[get_gcp_logging_client] = lambda: mock_client
+    _stats_cache.clear()
+
+    try:
+        first = await client.get("/api/v1/analysis/quick-stats?hours_back=24")
+        second = await client.get("/api/v1/analysis/quick-stats?hours_back=24")
+    finally:
+        app.dependency_overrides.clear()
+        _stats_cache.clear()
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json()["data"]["total_count"] == 3
+    mock_client.get_log_statistics.assert_awaited_once_with(hours_back=24)
+
+
+async def test_quick_stats_concurrent_misses(client, mock_log_statistics):
+    """Test concurrent misses share one fetch per key without blocking other keys."""
+    from app.api.routes.analysis import _stats_cache
+    from app.integrations.gcp import get_gcp_logging_client
+
+    release = asyncio.Event()
+
+    async def get_log_statistics(hours_back):
+        if hours_back == 24:
+            await release.wait()
+        return mock_log_statistics
+
+    mock_client = Mock()
+    mock_client.settings.gcp_project_id = "test-project"
+    mock_client.get_log_statistics = AsyncMock(side_effect=get_log_statistics)
+    app.dependency_overrides[get_gcp_logging_client] = lambda: mock_client
+    _stats_cache.clear()
+
+    try:
+        slow = [
+            asyncio.create_task(client.get("/api/v1/analysis/quick-stats?hours_back=24"))
+            for _ in range(2)
+        ]
+        # A different window is answered while the 24 hour fetch is still running
+        other = await asyncio.wait_for(
+            client.get("/api/v1/analysis/quick-stats?hours_back=1"), 1
+        )
+        release.set()
+        responses = await asyncio.gather(*slow)
+    finally:
+        app.dependency_overrides.clear()
+        _stats_cache.clear()
+
+    assert other.status_code == 200
+    assert all(response.status_code == 200 for response in responses)
+    assert mock_client.get_log_statistics.await_count == 2
@@ -0,0 +1,118 @@
+"""Unit tests for the analysis cache."""
+
+import sqlite3
+import time
+
+import pytest
+from unittest.mock import patch
+
+from app.core.analysis_cache import AnalysisCache, AnalysisKeyBuilder
+from app.core.persistent_cache import PersistentCache
+
+
+def _build_key(request_data, logs):
+    """Build a cache key the way AnalysisService does while streaming logs."""
+    builder = AnalysisKeyBuilder(request_data)
+    for log in logs:
+        builder.add_log(log)
+    return builder.key()
+
+
+class TestAnalysisKeyBuilder:
+    """Tests for Analysis Key Builder."""
+
+    def test_key_ignores_key_order(self, mock_gcp_logs):
+        """Test that the cache key does not depend on dict ordering."""
+        request_data = {"hours_back": 24, "focus_on_errors": True}
+        reordered = {"focus_on_errors": True, "hours_back": 24}
+
+        assert _build_key(request_data, mock_gcp_logs) == _build_key(reordered, mock_gcp_logs)
+
+    def test_key_changes_with_logs(self, mock_gcp_logs):
+        """Test that different log content produces a different key."""
+        request_data = {"hours_back": 24}
+
+        assert _build_key(request_data, mock_gcp_logs) != (
+            _build_key(request_data, mock_gcp_logs[:1])
+        )
+
+
+class TestAnalysisCache:
+    """Tests for Analysis Cache."""
+
+    @pytest.fixture
+    def analysis_cache(self):
+        """Create an analysis cache instance."""
+        return AnalysisCache(maxsize=10, ttl=60)
+
+    async def test_get_and_set(self, analysis_cache):
+        """Test storing and retrieving a cached analysis."""
+        assert await analysis_cache.get("missing") is None
+
+        await analysis_cache.set("key", b'{"analysis_id": "test-123"}')
+
+        assert await analysis_cache.get("key") == b'{"analysis_id": "test-123"}'
+
+    async def test_falls_back_to_persistent_cache(self, tmp_path):
+        """Test that an in-memory miss is served from the persistent cache."""
+        persistent = PersistentCache(str(tmp_path / "cache.db"), ttl=60)
+        persistent.set("key", b"payload")
+        analysis_cache = AnalysisCache(maxsize=10, ttl=60, persistent=persistent)
+
+        assert await analysis_cache.get("key") == b"payload"
+
+    async def test_promoted_entries_keep_remaining_lifetime(self, tmp_path):
+        """Test that an entry loaded from SQLite expires when it would have on disk."""
+        persistent = PersistentCache(str(tmp_path / "cache.db"), ttl=60)
+        with patch("app.core.persistent_cache.time.time", return_value=1000):
+            persistent.set("key", b"payload")
+        analysis_cache = AnalysisCache(maxsize=10, ttl=60, persistent=persistent)
+
+        with patch("app.core.persistent_cache.time.time", return_value=1055):
+            assert await analysis_cache.get("key") == b"payload"
+
+        # 5 seconds were left on disk, so the in-memory copy is gone 6 seconds later
+        analysis_cache._cache.expire(time.monotonic() + 6)
+        assert "key" not in analysis_cache._cache
+
+    async def test_set_writes_through_to_persistent_cache(self, tmp_path):
+        """Test that stored analyses reach the persistent cache."""
+        persistent = PersistentCache(str(tmp_path / "cache.db"), ttl=60)
+        analysis_cache = AnalysisCache(maxsize=10, ttl=60, persistent=persistent)
+
+        await analysis_cache.set("key", b"payload")
+
+        assert persistent.get("key") == b"payload"
+
+
+class TestPersistentCache:
+    """Tests for Persistent Cache."""
+
+    @pytest.fixture
+    def persistent_cache(self, tmp_path):
+        """Create a persistent cache backed by a temporary database."""
+        return PersistentCache(str(tmp_path / "cache.db"), ttl=60)
+
+    def test_survives_reopen(self, persistent_cache, tmp_path):
+        """Test that entries are still available after reopening the database."""
+        persistent_cache.set("key", b"payload")
+
+        reopened = PersistentCache(str(tmp_path / "cache.db"), ttl=60)
+
+        assert reopened.get("key") == b"payload"
+
+    def test_expired_entries(self, persistent_cache):
+        """Test that expired entries are not returned and get purged."""
+        with patch("app.core.persistent_cache.time.time", return_value=1000):
+            persistent_cache.set("key", b"payload")
+
+        with patch("app.core.persistent_cache.time.time", return_value=1061):
+            assert persistent_cache.get("key") is None
+            assert persistent_cache.purge_expired() == 1
+
+    def test_close(self, persistent_cache):
+        """Test that the database connection is closed."""
+        persistent_cache.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            persistent_cache.get("key")
@@ -0,0 +1,131 @@
+"""Unit tests for analysis service."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.analysis_cache import AnalysisKeyBuilder
+from app.schemas.analysis import LogAnalysisRequest, LogAnalysisResponse
+from app.services.analysis_service import AnalysisService
+
+
+class TestAnalysisService:
+    """Tests for Analysis Service."""
+
+    @pytest.fixture
+    def analysis_service(self, tmp_path):
+        """Create an analysis service with stubbed integrations."""
+        with patch("app.services.analysis_service.get_settings") as mock_settings, \
+             patch("app.services.analysis_service.get_gcp_logging_client"), \
+             patch("app.services.analysis_service.get_llm_service"), \
+             patch("app.services.analysis_service.get_document_service"), \
+             patch("app.services.analysis_service.get_analysis_cache"):
+            settings = MagicMock()
+            settings.analysis_output_dir = str(tmp_path)
+            settings.max_log_entries_to_analyze = 2
+            mock_settings.return_value = settings
+
+            yield AnalysisService()
+
+    async def test_collect_logs(self, analysis_service, mock_gcp_logs):
+        """Test statistics cover all logs while only a sample is kept."""
+        # Arrange
+        async def fetch_logs_stream(**kwargs):
+            for log in mock_gcp_logs:
+                yield log
+
+        analysis_service.gcp_client.fetch_logs_stream = fetch_logs_stream
+        request = LogAnalysisRequest(hours_back=24)
+
+        # Act
+        logs, statistics, cache_key = await analysis_service._collect_logs(request)
+
+        # Assert
+        assert logs == list(mock_gcp_logs[:2])
+        assert statistics == {
+            "total_count": 3,
+            "by_severity": {"ERROR": 2, "WARNING": 1},
+            "time_range_hours": 24
+        }
+        key_builder = AnalysisKeyBuilder(request.model_dump())
+        for log in mock_gcp_logs:
+            key_builder.add_log(log)
+        assert cache_key == key_builder.key()
+
+    def test_convert_findings_drops_invalid(self, analysis_service, caplog):
+        """Test malformed findings are dropped and defaults filled in."""
+        # Arrange
+        llm_findings = [
+            {"severity": "high", "title": "API timeouts"},
+            {"severity": "catastrophic", "title": "Unknown severity"},
+            "not a finding",
+            {"title": "No severity", "affected_logs_count": "3"}
+        ]
+
+        # Act
+        findings = analysis_service._convert_findings(llm_findings)
+
+        # Assert
+        assert [finding.title for finding in findings] == ["API timeouts", "No severity"]
+        assert findings[0].suggested_fix == ""
+        assert findings[1].severity == "info"
+        assert findings[1].affected_logs_count == 3
+        logged = [record.finding for record in caplog.records]
+        assert len(logged) == 2
+        assert "not a finding" in logged
+
+    async def test_analyze_logs_validates_llm_output(self, analysis_service, mock_gcp_logs):
+        """Test malformed LLM fields are dropped before the response is cached."""
+        # Arrange
+        async def fetch_logs_stream(**kwargs):
+            for log in mock_gcp_logs:
+                yield log
+
+        analysis_service.gcp_client.fetch_logs_stream = fetch_logs_stream
+        analysis_service.cache.get = AsyncMock(return_value=None)
+        analysis_service.cache.set = AsyncMock()
+        analysis_service.document_service.generate_document.return_value = "report.md"
+        analysis_service.llm_service.analyze_logs = AsyncMock(return_value={
+            "summary": {"text": "Database errors."},
+            "findings": [],
+            "recommendations": ["Check the database", 42],
+            "most_common_errors": [{"error": "Connection refused", "count": 3}, "Timeout"]
+        })
+
+        # Act
+        response = await analysis_service.analyze_logs(LogAnalysisRequest(hours_back=24))
+
+        # Assert
+        assert response.summary == ""
+        assert response.recommendations == ["Check the database"]
+        assert response.statistics.most_common_errors == ["Timeout"]
+        cached = analysis_service.cache.set.call_args.args[1]
+        assert LogAnalysisResponse.model_validate_json(cached) == response
+
+    async def test_analyze_logs_skips_cache_when_parsing_failed(
+        self,
+        analysis_service,
+        mock_gcp_logs
+    ):
+        """Test a placeholder analysis from an unparseable reply is not cached."""
+        # Arrange
+        async def fetch_logs_stream(**kwargs):
+            for log in mock_gcp_logs:
+                yield log
+
+        analysis_service.gcp_client.fetch_logs_stream = fetch_logs_stream
+        analysis_service.cache.get = AsyncMock(return_value=None)
+        analysis_service.cache.set = AsyncMock()
+        analysis_service.document_service.generate_document.return_value = "report.md"
+        analysis_service.llm_service.analyze_logs = AsyncMock(return_value={
+            "summary": "Analysis completed but response parsing failed",
+            "findings": [],
+            "recommendations": ["Review logs manually"],
+            "most_common_errors": [],
+            "parse_failed": True
+        })
+
+        # Act
+        await analysis_service.analyze_logs(LogAnalysisRequest(hours_back=24))
+
+        # Assert
+        analysis_service.cache.set.assert_not_awaited()
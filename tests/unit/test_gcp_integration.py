@@ -1,156 +1,352 @@
 """Unit tests for GCP integration."""
 
+import asyncio
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from contextlib import ExitStack, nullcontext
+from types import SimpleNamespace
+from unittest.mock import Mock, patch, AsyncMock
 
-from app.integrations.gcp.logging_client import GCPLoggingClient
+from app.integrations.gcp import logging_client
+from app.integrations.gcp.logging_client import GCPLoggingClient, _timestamp_filter
 from app.core.exceptions import GCPIntegrationError
 
 
+# Time range, in hours, the fetch tests query
+_HOURS_BACK = 24
+
+# Settings returned by the patched get_settings (use monkeypatch to change)
+_SETTINGS_STUB = SimpleNamespace(
+    gcp_project_id="test-project",
+    gcp_credentials_json=None,
+    gcp_log_filter="",
+    gcp_log_limit=100,
+    gcp_channel_pool_size=1,
+    gcp_request_timeout=30.0,
+    gcp_stats_limit=10000
+)
+
+
+class _AsyncPager:
+    """Stand-in for ListLogEntriesAsyncPager serving entries in pages."""
+
+    def __init__(self, entries, page_size=2, page_delay=0.0):
+        self._entries = list(entries)
+        self._page_size = page_size
+        self._page_delay = page_delay
+
+    @property
+    def pages(self):
+        return self._pages()
+
+    async def _pages(self):
+        for start in range(0, len(self._entries), self._page_size):
+            if start:
+                # Later pages are fetched from the API
+                await asyncio.sleep(self._page_delay)
+            yield SimpleNamespace(entries=self._entries[start:start + self._page_size])
+
+
+@pytest.fixture(scope="module")
+def _gcp_patches():
+    """Patch the logging client and transport classes and settings once for the module."""
+    with ExitStack() as stack:
+        patches = SimpleNamespace(
+            client=stack.enter_context(
+                patch.object(logging_client, "LoggingServiceV2AsyncClient")
+            ),
+            transport=stack.enter_context(
+                patch.object(logging_client, "LoggingServiceV2GrpcAsyncIOTransport")
+            )
+        )
+        stack.enter_context(
+            patch.object(logging_client, "get_settings", lambda: _SETTINGS_STUB)
+        )
+        yield patches
+
+
+@pytest.fixture(autouse=True)
+def mock_logging_client(_gcp_patches):
+    """Patched LoggingServiceV2AsyncClient class with its call history reset.
+
+    Autouse so every test in the module runs against the patches.
+    """
+    _gcp_patches.client.reset_mock()
+    _gcp_patches.transport.reset_mock()
+    return _gcp_patches.client
+
+
+@pytest.fixture
+def mock_transport(_gcp_patches):
+    """Patched LoggingServiceV2GrpcAsyncIOTransport class."""
+    return _gcp_patches.transport
+
+
+def _check_fetched_logs(result, severity_counts, hours_back):
+    """Check the result of fetch_logs over all mock entries."""
+    assert len(result) == severity_counts.total()
+    assert result[0]["severity"] == "ERROR"
+    assert result[1]["severity"] == "WARNING"
+    # Identical resources are interned into one shared dict
+    assert result[0]["resource"] is result[1]["resource"]
+
+
+def _check_error_logs(result, severity_counts, hours_back):
+    """Check the result of fetch_error_logs over the ERROR mock entries."""
+    assert len(result) == severity_counts["ERROR"]  # Only ERROR logs
+    assert all(log["severity"] == "ERROR" for log in result)
+
+
+def _check_log_statistics(stats, severity_counts, hours_back):
+    """Check the result of get_log_statistics over all mock entries."""
+    assert stats == {
+        "total_count": severity_counts.total(),
+        "by_severity": dict(severity_counts),
+        "time_range_hours": hours_back
+    }
+
+
 class TestGCPLoggingClient:
     """Tests for GCP Logging Client."""
 
-    @patch("app.integrations.gcp.logging_client.logging.Client")
-    @patch("app.integrations.gcp.logging_client.get_settings")
-    def test_initialization_success(self, mock_settings, mock_logging_client):
-        """Test successful client initialization."""
+    @pytest.mark.parametrize(
+        "project_id, expectation, code, client_count",
+        [
+            ("test-project", nullcontext(), None, 3),
+            (None, pytest.raises(GCPIntegrationError), "GCP_PROJECT_ID_MISSING", 0),
+        ],
+        ids=["configured", "missing_project_id"]
+    )
+    def test_initialization(
+        self,
+        monkeypatch,
+        mock_logging_client,
+        project_id,
+        expectation,
+        code,
+        client_count
+    ):
+        """Test client initialization with and without a project ID."""
         # Arrange
-        mock_settings.return_value.gcp_project_id = "test-project"
-        mock_settings.return_value.gcp_credentials_json = None
+        monkeypatch.setattr(_SETTINGS_STUB, "gcp_project_id", project_id)
+        monkeypatch.setattr(_SETTINGS_STUB, "gcp_channel_pool_size", 3)
 
         # Act
-        client = GCPLoggingClient()
+        with expectation as exc_info:
+            GCPLoggingClient()
 
         # Assert
-        assert client.client is not None
-        mock_logging_client.assert_called_once()
+        assert (exc_info.value.code if exc_info else None) == code
+        assert mock_logging_client.call_count == client_count
 
-    @patch("app.integrations.gcp.logging_client.get_settings")
-    def test_initialization_fails_without_project_id(self, mock_settings):
-        """Test that initialization fails without project ID."""
+    @pytest.mark.parametrize(
+        "credentials_json, loader, loader_arg",
+        [
+            ('{"type": "service_account"}', "from_service_account_info",
+             {"type": "service_account"}),
+            ('\n  {"type": "service_account"}', "from_service_account_info",
+             {"type": "service_account"}),
+            ("/secrets/credentials.json", "from_service_account_file",
+             "/secrets/credentials.json"),
+        ],
+        ids=["inline_json", "inline_json_leading_whitespace", "file_path"]
+    )
+    def test_initialization_loads_credentials(
+        self,
+        monkeypatch,
+        mock_transport,
+        credentials_json,
+        loader,
+        loader_arg
+    ):
+        """Test credentials are loaded from inline JSON or from a file path."""
         # Arrange
-        mock_settings.return_value.gcp_project_id = None
+        monkeypatch.setattr(_SETTINGS_STUB, "gcp_credentials_json", credentials_json)
 
-        # Act & Assert
-        with pytest.raises(GCPIntegrationError) as exc_info:
+        # Act
+        with patch.object(
+            logging_client.service_account.Credentials, "from_service_account_info"
+        ) as from_info, patch.object(
+            logging_client.service_account.Credentials, "from_service_account_file"
+        ) as from_file:
             GCPLoggingClient()
 
-        assert exc_info.value.code == "GCP_PROJECT_ID_MISSING"
+        # Assert
+        loaders = {"from_service_account_info": from_info, "from_service_account_file": from_file}
+        used = loaders.pop(loader)
+        used.assert_called_once_with(loader_arg)
+        for unused in loaders.values():
+            unused.assert_not_called()
+        assert mock_transport.create_channel.call_args.kwargs["credentials"] is used.return_value
+
+    def test_pooled_channels_use_separate_connections(
+        self,
+        monkeypatch,
+        mock_logging_client,
+        mock_transport
+    ):
+        """Test each pooled client gets a channel that cannot share a connection."""
+        # Arrange
+        monkeypatch.setattr(_SETTINGS_STUB, "gcp_channel_pool_size", 3)
+
+        # Act
+        GCPLoggingClient()
 
-    @patch("app.integrations.gcp.logging_client.logging.Client")
-    @patch("app.integrations.gcp.logging_client.get_settings")
-    def test_fetch_logs_success(self, mock_settings, mock_logging_client, mock_gcp_logs):
-        """Test successful log fetching."""
+        # Assert
+        channel_options = [
+            dict(call.kwargs["options"])
+            for call in mock_transport.create_channel.call_args_list
+        ]
+        assert len(channel_options) == 3
+        assert all(options["grpc.use_local_subchannel_pool"] == 1 for options in channel_options)
+        assert len({options["grpc.channel_id"] for options in channel_options}) == 3
+        assert all(
+            call.kwargs["transport"] is mock_transport.return_value
+            for call in mock_logging_client.call_args_list
+        )
+
+    @pytest.mark.parametrize(
+        "method, entries_fixture, check",
+        [
+            ("fetch_logs", "mock_gcp_log_entries", _check_fetched_logs),
+            ("fetch_error_logs", "mock_gcp_error_entries", _check_error_logs),
+            ("get_log_statistics", "mock_gcp_log_entries", _check_log_statistics),
+        ],
+        ids=["fetch_logs", "fetch_error_logs", "get_log_statistics"]
+    )
+    @pytest.mark.parametrize("hours_back", [_HOURS_BACK], ids=lambda hours: f"{hours}h")
+    async def test_fetch(
+        self,
+        request,
+        mock_logging_client,
+        mock_gcp_severity_counts,
+        method,
+        entries_fixture,
+        check,
+        hours_back
+    ):
+        """Test fetching logs and statistics from the returned entries."""
         # Arrange
-        mock_settings.return_value.gcp_project_id = "test-project"
-        mock_settings.return_value.gcp_credentials_json = None
-        mock_settings.return_value.gcp_log_filter = ""
-        mock_settings.return_value.gcp_log_limit = 100
-
-        mock_client_instance = MagicMock()
-        mock_logging_client.return_value = mock_client_instance
-
-        # Create mock log entries
-        mock_entries = []
-        for log in mock_gcp_logs:
-            mock_entry = MagicMock()
-            mock_entry.timestamp = datetime.fromisoformat(log["timestamp"].replace("Z", "+00:00"))
-            mock_entry.severity = log["severity"]
-            mock_entry.log_name = log["log_name"]
-            mock_entry.payload = log["text_payload"]
-            mock_entry.labels = log["labels"]
-            mock_entry.insert_id = log["insert_id"]
-            mock_entry.resource = MagicMock()
-            mock_entry.resource.type = log["resource"]["type"]
-            mock_entry.resource.labels = log["resource"]["labels"]
-            mock_entries.append(mock_entry)
-
-        mock_client_instance.list_entries.return_value = mock_entries
+        entries = request.getfixturevalue(entries_fixture)
+        mock_logging_client.return_value.list_log_entries = AsyncMock(
+            return_value=_AsyncPager(entries)
+        )
 
         # Act
         client = GCPLoggingClient()
-        result = client.fetch_logs(hours_back=24)
+        result = await getattr(client, method)(hours_back=hours_back)
 
         # Assert
-        assert len(result) == len(mock_gcp_logs)
-        assert result[0]["severity"] == "ERROR"
-        assert result[1]["severity"] == "WARNING"
-
-    @patch("app.integrations.gcp.logging_client.logging.Client")
-    @patch("app.integrations.gcp.logging_client.get_settings")
-    def test_fetch_error_logs(self, mock_settings, mock_logging_client, mock_gcp_logs):
-        """Test fetching error logs specifically."""
+        check(result, mock_gcp_severity_counts, hours_back)
+
+    async def test_fetch_logs_stream_fields(
+        self,
+        mock_logging_client,
+        mock_gcp_logs,
+        mock_gcp_log_entries
+    ):
+        """Test streaming logs with only selected fields."""
         # Arrange
-        mock_settings.return_value.gcp_project_id = "test-project"
-        mock_settings.return_value.gcp_credentials_json = None
-        mock_settings.return_value.gcp_log_filter = ""
-        mock_settings.return_value.gcp_log_limit = 100
-
-        mock_client_instance = MagicMock()
-        mock_logging_client.return_value = mock_client_instance
-
-        # Only return ERROR logs
-        error_logs = [log for log in mock_gcp_logs if log["severity"] == "ERROR"]
-        mock_entries = []
-        for log in error_logs:
-            mock_entry = MagicMock()
-            mock_entry.timestamp = datetime.fromisoformat(log["timestamp"].replace("Z", "+00:00"))
-            mock_entry.severity = log["severity"]
-            mock_entry.log_name = log["log_name"]
-            mock_entry.payload = log["text_payload"]
-            mock_entry.labels = log["labels"]
-            mock_entry.insert_id = log["insert_id"]
-            mock_entry.resource = MagicMock()
-            mock_entry.resource.type = log["resource"]["type"]
-            mock_entry.resource.labels = log["resource"]["labels"]
-            mock_entries.append(mock_entry)
-
-        mock_client_instance.list_entries.return_value = mock_entries
+        mock_client_instance = mock_logging_client.return_value
+
+        mock_client_instance.list_log_entries = AsyncMock(
+            return_value=_AsyncPager(mock_gcp_log_entries)
+        )
 
         # Act
         client = GCPLoggingClient()
-        result = client.fetch_error_logs(hours_back=24)
+        result = [
+            log async for log in client.fetch_logs_stream(
+                hours_back=_HOURS_BACK,
+                fields=("severity", "insert_id")
+            )
+        ]
 
         # Assert
-        assert len(result) == 2  # Only ERROR logs
-        assert all(log["severity"] == "ERROR" for log in result)
+        assert result == [
+            {"severity": log["severity"], "insert_id": log["insert_id"]}
+            for log in mock_gcp_logs
+        ]
 
-    @patch("app.integrations.gcp.logging_client.logging.Client")
-    @patch("app.integrations.gcp.logging_client.get_settings")
-    def test_get_log_statistics(self, mock_settings, mock_logging_client, mock_gcp_logs):
-        """Test getting log statistics."""
+    async def test_fetch_logs_stops_at_max_results(
+        self,
+        mock_logging_client,
+        mock_gcp_logs,
+        mock_gcp_log_entries
+    ):
+        """Test that fetching stops once max_results entries are returned."""
         # Arrange
-        mock_settings.return_value.gcp_project_id = "test-project"
-        mock_settings.return_value.gcp_credentials_json = None
-        mock_settings.return_value.gcp_log_filter = ""
-        mock_settings.return_value.gcp_log_limit = 100
-
-        mock_client_instance = MagicMock()
-        mock_logging_client.return_value = mock_client_instance
-
-        mock_entries = []
-        for log in mock_gcp_logs:
-            mock_entry = MagicMock()
-            mock_entry.timestamp = datetime.fromisoformat(log["timestamp"].replace("Z", "+00:00"))
-            mock_entry.severity = log["severity"]
-            mock_entry.log_name = log["log_name"]
-            mock_entry.payload = log["text_payload"]
-            mock_entry.labels = log["labels"]
-            mock_entry.insert_id = log["insert_id"]
-            mock_entry.resource = MagicMock()
-            mock_entry.resource.type = log["resource"]["type"]
-            mock_entry.resource.labels = log["resource"]["labels"]
-            mock_entries.append(mock_entry)
-
-        mock_client_instance.list_entries.return_value = mock_entries
+        mock_client_instance = mock_logging_client.return_value
+
+        mock_client_instance.list_log_entries = AsyncMock(
+            return_value=_AsyncPager(mock_gcp_log_entries)
+        )
 
         # Act
         client = GCPLoggingClient()
-        stats = client.get_log_statistics(hours_back=24)
+        result = [
+            log async for log in client.fetch_logs_stream(
+                hours_back=_HOURS_BACK,
+                max_results=2,
+                fields=("insert_id",)
+            )
+        ]
 
         # Assert
-        assert stats["total_count"] == 3
-        assert stats["by_severity"]["ERROR"] == 2
-        assert stats["by_severity"]["WARNING"] == 1
-        assert stats["time_range_hours"] == 24
+        assert result == [{"insert_id": log["insert_id"]} for log in mock_gcp_logs[:2]]
+        call = mock_client_instance.list_log_entries.call_args
+        assert call.kwargs["request"].page_size == 2
+        assert call.kwargs["request"].order_by == "timestamp desc"
+        assert call.kwargs["timeout"] == 30.0
+
+    async def test_fetch_logs_times_out_across_pages(
+        self,
+        monkeypatch,
+        mock_logging_client,
+        mock_gcp_log_entries
+    ):
+        """Test that the request timeout bounds fetching every page, not just the first."""
+        # Arrange
+        monkeypatch.setattr(_SETTINGS_STUB, "gcp_request_timeout", 0.05)
+        mock_logging_client.return_value.list_log_entries = AsyncMock(
+            return_value=_AsyncPager(mock_gcp_log_entries, page_size=1, page_delay=1.0)
+        )
+
+        # Act
+        client = GCPLoggingClient()
+        with pytest.raises(GCPIntegrationError) as exc_info:
+            await client.fetch_logs(hours_back=_HOURS_BACK)
+
+        # Assert
+        assert exc_info.value.code == "GCP_REQUEST_TIMEOUT"
+
+    async def test_get_log_statistics_stops_at_stats_limit(
+        self,
+        monkeypatch,
+        mock_logging_client,
+        mock_gcp_log_entries
+    ):
+        """Test that statistics count at most gcp_stats_limit entries."""
+        # Arrange
+        monkeypatch.setattr(_SETTINGS_STUB, "gcp_stats_limit", 2)
+        mock_client_instance = mock_logging_client.return_value
+        mock_client_instance.list_log_entries = AsyncMock(
+            return_value=_AsyncPager(mock_gcp_log_entries, page_size=1)
+        )
+
+        # Act
+        client = GCPLoggingClient()
+        stats = await client.get_log_statistics(hours_back=_HOURS_BACK)
+
+        # Assert
+        assert stats["total_count"] == 2
+        call = mock_client_instance.list_log_entries.call_args
+        assert call.kwargs["request"].page_size == 2
+
+    def test_timestamp_filter(self):
+        """Test that the timestamp filter is built from the minute bucket."""
+        # 2024-01-01T00:00:00Z expressed in whole minutes since the epoch
+        minute_bucket = 1704067200 // 60
+
+        assert _timestamp_filter(minute_bucket, 1) == 'timestamp >= "2023-12-31T23:00:00Z"'
+
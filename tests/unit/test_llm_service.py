@@ -0,0 +1,297 @@
+"""Unit tests for LLM service."""
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from langchain.chat_models.fake import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+
+from app.services.llm_service import LLMService
+
+
+class TestLLMService:
+    """Tests for LLM Service."""
+
+    @pytest.fixture
+    def llm_service(self):
+        """Create an LLM service with a stubbed chat model."""
+        with patch("app.services.llm_service.get_settings") as mock_settings, \
+             patch("app.services.llm_service.ChatOpenAI"):
+            settings = MagicMock()
+            settings.llm_provider = "openai"
+            settings.openai_api_key = "test-key"
+            settings.llm_chunk_size = 2
+            settings.llm_concurrency = 2
+            settings.max_log_entries_to_analyze = 50
+            settings.llm_model = "gpt-4"
+            settings.llm_temperature = 0.7
+            settings.llm_cache_size = 16
+            settings.llm_cache_ttl = 3600
+            settings.llm_hedge = False
+            settings.llm_hedge_model = None
+            mock_settings.return_value = settings
+
+            yield LLMService()
+
+    async def test_analyze_logs(self, llm_service, mock_gcp_logs):
+        """Test logs are analyzed per chunk and the results merged."""
+        # Arrange
+        llm_service.llm = FakeListChatModel(responses=[
+            '```json\n{"summary": "Database errors.", "findings": [], '
+            '"recommendations": ["Check the database"], '
+            '"most_common_errors": ["Connection refused"]}\n```',
+            '{"summary": "Timeouts.", "findings": [], '
+            '"recommendations": ["Check the database"], '
+            '"most_common_errors": ["Timeout"]}'
+        ])
+        statistics = {"total_count": 3, "by_severity": {"ERROR": 3}, "time_range_hours": 24}
+        # One request at a time so the fake model's responses go to the chunks in order
+        llm_service.settings.llm_concurrency = 1
+
+        # Act
+        result = await llm_service.analyze_logs(mock_gcp_logs, statistics)
+
+        # Assert
+        assert result["summary"] == "Database errors. Timeouts."
+        assert result["recommendations"] == ["Check the database"]
+        assert result["most_common_errors"] == ["Connection refused", "Timeout"]
+
+    def test_chunk_logs(self, llm_service):
+        """Test logs are split into numbered chunks."""
+        # Arrange
+        logs = [{"insert_id": str(i)} for i in range(5)]
+
+        # Act
+        chunks = llm_service._chunk_logs(logs)
+
+        # Assert
+        assert [len(chunk) for chunk, _ in chunks] == [2, 2, 1]
+        assert [start for _, start in chunks] == [1, 3, 5]
+
+    async def test_invoke_hedged_returns_first_response(self, llm_service):
+        """Test a hedged request returns the fastest provider's response."""
+        # Arrange
+        cancelled = asyncio.Event()
+
+        async def slow_llm(prompt):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        llm_service.llm = RunnableLambda(slow_llm)
+        llm_service.hedge_llm = FakeListChatModel(responses=['{"summary": "Fast"}'])
+
+        # Act
+        response = await asyncio.wait_for(llm_service._invoke({"user_msg": "logs"}), 1)
+
+        # Assert
+        assert response.content == '{"summary": "Fast"}'
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)  # Let the cancelled request finish unwinding
+
+    async def test_invoke_hedged_falls_back_on_error(self, llm_service):
+        """Test a hedged request uses the other provider when one fails."""
+        # Arrange
+        async def failing_llm(prompt):
+            raise RuntimeError("rate limited")
+
+        llm_service.llm = RunnableLambda(failing_llm)
+        llm_service.hedge_llm = FakeListChatModel(responses=['{"summary": "Fallback"}'])
+
+        # Act
+        response = await llm_service._invoke({"user_msg": "logs"})
+
+        # Assert
+        assert response.content == '{"summary": "Fallback"}'
+
+    async def test_analyze_logs_reuses_cached_result(self, llm_service, mock_gcp_logs):
+        """Test the same log messages are not sent to the LLM twice."""
+        # Arrange
+        llm_service.llm = FakeListChatModel(responses=['{"summary": "Database errors."}'])
+        statistics = {"total_count": 3, "by_severity": {"ERROR": 3}, "time_range_hours": 24}
+        first = await llm_service.analyze_logs(mock_gcp_logs, statistics)
+
+        # Act
+        llm_service.llm = FakeListChatModel(responses=['{"summary": "Should not be used."}'])
+        reordered = await llm_service.analyze_logs(mock_gcp_logs[::-1], statistics)
+
+        # Assert
+        assert reordered is first
+
+    async def test_analyze_logs_cache_tracks_volume(self, llm_service, mock_gcp_logs):
+        """Test the same messages at a different volume are analyzed again."""
+        # Arrange
+        llm_service.llm = FakeListChatModel(responses=['{"summary": "Database errors."}'])
+        statistics = {"total_count": 3, "by_severity": {"ERROR": 3}, "time_range_hours": 24}
+        await llm_service.analyze_logs(mock_gcp_logs, statistics)
+
+        # Act
+        llm_service.llm = FakeListChatModel(responses=['{"summary": "Error storm."}'])
+        busier = await llm_service.analyze_logs(
+            mock_gcp_logs,
+            {"total_count": 300, "by_severity": {"ERROR": 300}, "time_range_hours": 24}
+        )
+
+        # Assert
+        assert busier["summary"].startswith("Error storm.")
+
+    def test_result_cache_key_covers_hedge_model(self, llm_service, mock_gcp_logs):
+        """Test results won by a hedge model aren't shared with the primary alone."""
+        # Arrange
+        log_groups = llm_service._group_logs(list(mock_gcp_logs))
+        statistics = {"total_count": 3, "by_severity": {"ERROR": 3}, "time_range_hours": 24}
+        primary_key = llm_service._result_cache_key(log_groups, statistics)
+
+        # Act
+        llm_service.hedge_llm = FakeListChatModel(responses=["{}"])
+        hedged_key = llm_service._result_cache_key(log_groups, statistics)
+
+        # Assert
+        assert hedged_key != primary_key
+
+    def test_group_logs(self, llm_service):
+        """Test repeated messages differing only in IDs are collapsed."""
+        # Arrange
+        logs = [
+            {"severity": "ERROR", "text_payload": "Request 1234 timed out after 30s"},
+            {"severity": "ERROR", "text_payload": "Request 5678 timed out after 31s"},
+            {"severity": "WARNING", "text_payload": "Request 9999 timed out after 30s"},
+            {"severity": "ERROR", "text_payload": "Connection refused"},
+        ]
+
+        # Act
+        groups = llm_service._group_logs(logs)
+
+        # Assert
+        assert groups == [(logs[0], 2), (logs[2], 1), (logs[3], 1)]
+
+    def test_merge_results(self, llm_service):
+        """Test per-chunk results are combined into one analysis."""
+        # Arrange
+        results = [
+            {
+                "summary": "First chunk.",
+                "findings": [{"title": "A"}],
+                "recommendations": ["Add retries", "Check quotas"],
+                "most_common_errors": ["Timeout", "Connection refused"]
+            },
+            {
+                "summary": "Second chunk.",
+                "findings": [{"title": "B"}],
+                "recommendations": ["Add retries"],
+                "most_common_errors": ["Timeout"]
+            }
+        ]
+
+        # Act
+        merged = llm_service._merge_results(results)
+
+        # Assert
+        assert merged["summary"] == "First chunk. Second chunk."
+        assert [finding["title"] for finding in merged["findings"]] == ["A", "B"]
+        assert merged["recommendations"] == ["Add retries", "Check quotas"]
+        assert merged["most_common_errors"] == ["Timeout", "Connection refused"]
+
+    def test_merge_results_normalizes_malformed_chunks(self, llm_service):
+        """Test chunk fields of the wrong type don't break the merge."""
+        # Arrange
+        results = [
+            {
+                "summary": "First chunk.",
+                "findings": [{"title": "A"}, "not a finding"],
+                "recommendations": ["Add retries"],
+                "most_common_errors": "Timeout"
+            },
+            {
+                "summary": {"text": "Second chunk."},
+                "findings": None,
+                "recommendations": ["Add retries", 3],
+                "most_common_errors": [{"error": "Timeout", "count": 3}, "Connection refused"]
+            },
+            ["not", "an", "object"]
+        ]
+
+        # Act
+        merged = llm_service._merge_results(results)
+
+        # Assert
+        assert merged == {
+            "summary": "First chunk.",
+            "findings": [{"title": "A"}],
+            "recommendations": ["Add retries"],
+            "most_common_errors": ["Timeout", "Connection refused"]
+        }
+
+    def test_prepare_log_summary(self, llm_service):
+        """Test logs are formatted with compact JSON payloads."""
+        # Arrange
+        logs = [
+            {
+                "timestamp": "2024-01-01T00:00:00Z",
+                "severity": "ERROR",
+                "log_name": "app",
+                "json_payload": {"error": "timeout", "retries": 3},
+                "resource": {"type": "gce_instance", "labels": {}}
+            }
+        ]
+
+        # Act
+        summary = llm_service._prepare_log_summary([(log, 4) for log in logs], start=3)
+
+        # Assert
+        assert summary == (
+            "Log #3 (seen 4 times):\n"
+            "  Timestamp: 2024-01-01T00:00:00Z\n"
+            "  Severity: ERROR\n"
+            "  Log Name: app\n"
+            '  JSON: {"error": "timeout", "retries": 3}\n'
+            "  Resource Type: gce_instance\n"
+        )
+
+    @pytest.mark.parametrize("response", [
+        '{"summary": "All good"}',
+        '```json\n{"summary": "All good"}\n```',
+        '  ```\n{"summary": "All good"}\n```  ',
+    ])
+    def test_parse_llm_response(self, llm_service, response):
+        """Test JSON is parsed with or without a markdown code fence."""
+        # Act
+        result = llm_service._parse_llm_response(response)
+
+        # Assert
+        assert result == {
+            "summary": "All good",
+            "findings": [],
+            "recommendations": [],
+            "most_common_errors": []
+        }
+
+    @pytest.mark.parametrize("response", ["The logs look fine.", '["The logs look fine."]'])
+    def test_parse_llm_response_invalid_json(self, llm_service, response):
+        """Test an unparseable response falls back to a flagged manual-review finding."""
+        # Act
+        result = llm_service._parse_llm_response(response)
+
+        # Assert
+        assert result["findings"][0]["description"] == response
+        assert result["recommendations"] == ["Review logs manually"]
+        assert result["parse_failed"] is True
+
+    async def test_analyze_logs_does_not_cache_unparsed_result(self, llm_service, mock_gcp_logs):
+        """Test a reply that couldn't be parsed is retried on the next analysis."""
+        # Arrange
+        llm_service.llm = FakeListChatModel(responses=["Not JSON"])
+        statistics = {"total_count": 3, "by_severity": {"ERROR": 3}, "time_range_hours": 24}
+        first = await llm_service.analyze_logs(mock_gcp_logs, statistics)
+
+        # Act
+        llm_service.llm = FakeListChatModel(responses=['{"summary": "Database errors."}'])
+        second = await llm_service.analyze_logs(mock_gcp_logs, statistics)
+
+        # Assert
+        assert first["parse_failed"] is True
+        assert "parse_failed" not in second